@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('ui', 'ui'), ('core', 'core')],
-    hiddenimports=['sounddevice', 'numpy'],
+    hiddenimports=['sounddevice', 'numpy', 'pynput.keyboard._win32', 'pynput.mouse._win32'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,408 @@
+import argparse
+import asyncio
+import glob
+import os
+import pickle
+import re
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import mss
+from mss.screenshot import ScreenShot
+import numpy as np
+from PIL import Image
+
+from core.vision import VisionWatcher
+from core.ocr_backend import BACKENDS, OcrUnavailable
+from core.capture import GrayConverter, frame_view
+from core.capture_backend import BACKENDS as CAPTURE_BACKENDS, create_capture_backend
+from core.ocr import ocr_pixels
+from core.preprocess import PROFILES, Preprocessor
+from core.frame_ring import FrameRing, SharedRegion
+from core.ai_engine import AIEngine, RED_PATTERNS, YELLOW_PATTERNS
+from core.threat_matcher import ThreatMatcher
+from core import phrase_matcher
+from core.phrase_matcher import NormalizedText, PhraseMatcher
+from core.loop_lag import LoopLagMonitor
+from core.vision_process import VisionProcess
+
+
+def load_frame(path=None):
+    """Returns a BGRA frame from an image file, or a screenshot of the primary monitor"""
+    if path:
+        img = Image.open(path).convert("RGBA")
+        rgba = np.asarray(img)
+        return np.ascontiguousarray(rgba[:, :, [2, 1, 0, 3]])
+    with mss.mss() as sct:
+        shot = sct.grab(sct.monitors[1])
+        return np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4).copy()
+
+
+def bench_workers(frame, worker_counts, frames):
+    print(f"Full-frame OCR of a {frame.shape[1]}x{frame.shape[0]} frame, {frames} frames per run")
+    for workers in worker_counts:
+        watcher = VisionWatcher(None, ocr_workers=workers, cache_bytes=0)
+        worker = watcher.create_worker(1, {"left": 0, "top": 0, "width": frame.shape[1], "height": frame.shape[0]})
+        watcher.pool.start()
+        try:
+            # Warm-up so process startup is not counted
+            worker.ocr_frame(frame)
+            start = time.perf_counter()
+            for _ in range(frames):
+                worker.detector.reset()
+                worker.ocr_frame(frame)
+            elapsed = time.perf_counter() - start
+        finally:
+            watcher.pool.stop()
+        print(f"workers={workers:2d}  {frames / elapsed:6.2f} frames/sec  ({elapsed / frames * 1000:.0f} ms/frame)")
+
+
+def bench_backends(frame, calls, size=(320, 160)):
+    w, h = size
+    region = np.ascontiguousarray(frame[:h, :w])
+    print(f"Per-call OCR latency on a {w}x{h} region, {calls} calls per backend")
+    for name, cls in BACKENDS.items():
+        try:
+            backend = cls()
+            backend.image_to_data(region)  # Warm-up (engine load)
+        except OcrUnavailable as e:
+            print(f"{name:12s} unavailable: {e}")
+            continue
+        timings = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            backend.image_to_data(region)
+            timings.append(time.perf_counter() - start)
+        backend.close()
+        timings.sort()
+        print(f"{name:12s} median {timings[len(timings) // 2] * 1000:7.1f} ms   max {timings[-1] * 1000:7.1f} ms")
+
+
+def bench_capture(bgra, frames):
+    """Screenshot -> OCR input: old PIL path against the zero-copy grayscale path"""
+    height, width = bgra.shape[:2]
+    shot = ScreenShot.from_size(bytearray(bgra.tobytes()), width, height)
+
+    def pil_path():
+        img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+        # What pytesseract does before handing the image to tesseract
+        img.tobytes()
+        return img
+
+    converter = GrayConverter()
+
+    def gray_path():
+        return converter.convert(frame_view(shot))
+
+    print(f"Capture -> OCR input for a {width}x{height} frame, {frames} frames")
+    for name, path in (("PIL RGB (before)", pil_path), ("NumPy gray (after)", gray_path)):
+        path()  # Warm-up (scratch buffers)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            path()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:20s} {elapsed / frames * 1000:7.1f} ms/frame   peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+def bench_grab(frames, source=None):
+    """Grab latency of every capture backend on the primary monitor (run under Xvfb for headless numbers)"""
+    print(f"Grab latency of the primary monitor, {frames} frames per backend")
+    for name in CAPTURE_BACKENDS:
+        options = {"source": source} if name == "replay" else {}
+        try:
+            backend = create_capture_backend(name, **options)
+        except Exception as e:
+            print(f"{name:8s} unavailable: {e}")
+            continue
+        try:
+            monitor = backend.monitors[1]
+            backend.release(backend.grab(monitor))  # Warm-up
+            timings = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                frame = backend.grab(monitor)
+                timings.append(time.perf_counter() - start)
+                backend.release(frame)
+        finally:
+            backend.close()
+        timings.sort()
+        print(f"{name:8s} {monitor['width']}x{monitor['height']}  median {timings[len(timings) // 2] * 1000:7.2f} ms"
+              f"   max {timings[-1] * 1000:7.2f} ms")
+
+
+def _touch(pixels):
+    """Worker side of the handoff benchmark: resolve the pixels and read them once"""
+    if isinstance(pixels, SharedRegion):
+        pixels = pixels.view()
+    return int(pixels[::64, ::64].sum())
+
+
+def bench_handoff(gray, frames, workers=4, tile_height=160, tile_width=320):
+    """Frame handoff to OCR worker processes: pickled regions against the shared-memory frame ring.
+
+    Run for a fully dirty frame (every band) and a sparse one (two dirty tiles).
+    """
+    height, width = gray.shape
+    cases = (
+        ("full frame", [(0, y, width, min(y + tile_height, height)) for y in range(0, height, tile_height)]),
+        ("two tiles", [(0, 0, min(tile_width, width), min(tile_height, height)),
+                       (max(width - tile_width, 0), max(height - tile_height, 0), width, height)]),
+    )
+    ring = FrameRing()
+
+    def pickled(rects):
+        return [np.ascontiguousarray(gray[y0:y1, x0:x1]) for x0, y0, x1, y1 in rects], None
+
+    def shared(rects):
+        ref = ring.write(gray)
+        return [ref.region(*rect) for rect in rects], ref
+
+    print(f"Handing regions of a {width}x{height} frame to {workers} worker processes, {frames} frames")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_touch, [gray[:8, :8]] * workers))  # Warm-up (process start)
+        for case, rects in cases:
+            area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) / (width * height)
+            print(f"{case}: {len(rects)} regions, {area:.0%} of the frame")
+            for name, make_jobs in (("pickled regions", pickled), ("shared memory", shared)):
+                jobs, ref = make_jobs(rects)
+                payload = sum(len(pickle.dumps(job, protocol=pickle.HIGHEST_PROTOCOL)) for job in jobs)
+                if ref is not None:
+                    ring.release(ref)
+                # Untimed frames first: every worker attaches to (and faults in) the shared slots once
+                for i in range(frames + 5):
+                    if i == 5:
+                        start = time.perf_counter()
+                    jobs, ref = make_jobs(rects)
+                    list(executor.map(_touch, jobs))
+                    if ref is not None:
+                        ring.release(ref)
+                elapsed = time.perf_counter() - start
+                print(f"  {name:16s} {elapsed / frames * 1000:8.2f} ms/frame   {payload / 1024:10.1f} KiB pickled per frame")
+    ring.close()
+
+
+def bench_lag(source, seconds):
+    """Event loop lag while the vision pipeline runs on recorded frames, in this process against in a child process"""
+
+    async def measure(monitor):
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(seconds)
+        task.cancel()
+
+    options = {"capture_backend": "replay", "capture_source": source, "input_triggers": False,
+               "min_interval": 0.0, "max_interval": 0.5}
+    print(f"Event loop lag over {seconds:.0f} s, 10 ms sleeps (vision on {source})")
+    for name, factory in (("idle", None), ("in-process", VisionWatcher), ("vision process", VisionProcess)):
+        watcher = factory(AIEngine(), **options) if factory else None
+        if watcher:
+            watcher.start()
+            time.sleep(3)  # OCR pool and child process start-up
+        monitor = LoopLagMonitor(interval=0.01, window=100000)
+        try:
+            asyncio.run(measure(monitor))
+        finally:
+            if watcher:
+                frames = watcher.get_stats().get("frames", 0)
+                watcher.stop()
+        stats = monitor.get_stats()
+        print(f"{name:16s} p50 {stats['p50_ms']:7.2f} ms   p99 {stats['p99_ms']:7.2f} ms   max {stats['max_ms']:7.2f} ms"
+              + (f"   {frames} frames" if watcher else ""))
+
+
+def screen_text(words, threat=None, seed=0):
+    """Synthetic OCR text: random dictionary-like words, with an optional threat phrase near the end"""
+    rng = np.random.default_rng(seed)
+    vocabulary = ["settings", "inbox", "message", "window", "document", "report", "meeting", "update", "folder",
+                  "calendar", "search", "profile", "download", "share", "comment", "project", "invoice", "team"]
+    text = " ".join(rng.choice(vocabulary, size=words))
+    if threat:
+        cut = len(text) * 9 // 10
+        text = f"{text[:cut]} {threat} {text[cut:]}"
+    return text
+
+
+def bench_match(calls):
+    """Threat matching: the per-pattern re.search loop against the single-pass ThreatMatcher"""
+    signatures = [("RED", p) for p in RED_PATTERNS] + [("YELLOW", p) for p in YELLOW_PATTERNS]
+    matcher = ThreatMatcher(signatures)
+
+    def loop_first(text):
+        # What AIEngine did before: lists rebuilt per call, one search per pattern, stop at the first hit
+        red_patterns, yellow_patterns = list(RED_PATTERNS), list(YELLOW_PATTERNS)
+        for p in red_patterns:
+            if re.search(p, text):
+                return [("RED", p)]
+        for p in yellow_patterns:
+            if re.search(p, text):
+                return [("YELLOW", p)]
+        return []
+
+    def loop_all(text):
+        return [(severity, p) + m.span() for severity, p in signatures for m in re.finditer(p, text)]
+
+    print(f"{len(signatures)} signatures, {calls} calls per text")
+    for words in (50, 500, 5000):
+        for threat in (None, "urgent", "account suspended"):
+            text = screen_text(words, threat).lower()
+            row = []
+            for name, func in (("loop, first hit", loop_first), ("loop, all hits", loop_all),
+                               ("ThreatMatcher", matcher.find_all)):
+                start = time.perf_counter()
+                for _ in range(calls):
+                    found = func(text)
+                row.append(f"{name} {(time.perf_counter() - start) / calls * 1e6:9.1f} us ({len(found)})")
+            print(f"{words:5d} words, {threat or 'no threat':17s}  " + "   ".join(row))
+
+    # Cost as the signature list grows: synthetic two-word phrases on a 5000-word screen
+    text = screen_text(5000, "account suspended").lower()
+    rng = np.random.default_rng(1)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    for count in (10, 100, 1000):
+        phrases = [("YELLOW", f"{''.join(rng.choice(letters, 6))} {''.join(rng.choice(letters, 5))}")
+                   for _ in range(count - len(signatures))]
+        extended = signatures + phrases
+        matcher = ThreatMatcher(extended)
+        row = []
+        for name, func in (("loop, all hits", lambda t: [m.span() for _, p in extended for m in re.finditer(p, t)]),
+                           ("ThreatMatcher", matcher.find_all)):
+            start = time.perf_counter()
+            for _ in range(max(1, calls // 10)):
+                found = func(text)
+            row.append(f"{name} {(time.perf_counter() - start) / max(1, calls // 10) * 1e3:8.2f} ms ({len(found)})")
+        print(f"{count:5d} signatures, 5000 words  " + "   ".join(row))
+
+
+def bench_phrases(calls, counts):
+    """Phrase matching throughput per backend as the phrase list grows, on a 5000-word screen"""
+    text = screen_text(5000, "Account Suspended")
+    vocabulary = text.split()[:200]
+    rng = np.random.default_rng(2)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    backends = ["regex", "python"] + (["pyahocorasick"] if phrase_matcher.ahocorasick is not None else [])
+    print(f"{len(text)} characters of text, {calls} calls" +
+          ("" if "pyahocorasick" in backends else " (pyahocorasick not installed)"))
+    for count in counts:
+        # Half the phrases start with a word that is on screen, so the automaton walks past the root
+        phrases = ["account suspended"] + [
+            f"{rng.choice(vocabulary) if i % 2 else ''.join(rng.choice(letters, 6))} {''.join(rng.choice(letters, 5))}"
+            for i in range(count - 1)]
+        rows = []
+        if count <= 1000:
+            compiled = [re.compile(re.escape(phrase)) for phrase in phrases]
+            start = time.perf_counter()
+            for _ in range(calls):
+                normalized = NormalizedText(text).text
+                found = [m.span() for regex in compiled for m in regex.finditer(normalized)]
+            rows.append(("re loop", 0.0, (time.perf_counter() - start) / calls, len(found)))
+        for backend in backends:
+            start = time.perf_counter()
+            matcher = PhraseMatcher(((phrase, phrase) for phrase in phrases), backend=backend)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(calls):
+                found = matcher.find_all(text)
+            rows.append((backend, build, (time.perf_counter() - start) / calls, len(found)))
+        for name, build, scan, found in rows:
+            print(f"{count:7d} phrases  {name:14s} build {build:7.2f} s   {scan * 1e3:8.2f} ms/screen "
+                  f"{len(text) / scan / 1e6:7.1f} MB/s   ({found} hits)")
+
+
+def load_corpus(directory):
+    """Pairs every screenshot in a directory with the words of its .txt ground truth"""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.png")) + glob.glob(os.path.join(directory, "*.jpg"))):
+        truth_path = os.path.splitext(path)[0] + ".txt"
+        if not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding="utf-8") as f:
+            truth = {w for w in re.findall(r"\w[\w.-]*\w", f.read().lower()) if len(w) > 3}
+        corpus.append((path, GrayConverter().convert(load_frame(path)), truth))
+    return corpus
+
+
+def bench_preprocess(corpus, dpi_scale):
+    """OCR time and word recall for every single step and every profile"""
+    variants = {"raw": ("grayscale",)}
+    for step in ("invert_dark", "normalize_contrast", "binarize", "downscale"):
+        variants[f"+{step}"] = ("grayscale", step)
+    variants.update({f"profile:{name}": steps for name, steps in PROFILES.items()})
+
+    print(f"{len(corpus)} screenshots, dpi_scale={dpi_scale}")
+    for name, steps in variants.items():
+        preprocessor = Preprocessor(steps, dpi_scale=dpi_scale)
+        elapsed, found, total = 0.0, 0, 0
+        for _, gray, truth in corpus:
+            start = time.perf_counter()
+            result = ocr_pixels(gray, 0, 0, preprocessor=preprocessor)
+            elapsed += time.perf_counter() - start
+            words = {w.lower().strip(".,:;!?()[]\"'") for w in result.words()}
+            found += len(truth & words)
+            total += len(truth)
+        recall = found / total if total else 0.0
+        print(f"{name:28s} {elapsed / max(len(corpus), 1) * 1000:8.1f} ms/image   recall {recall:6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vision pipeline benchmarks")
+    parser.add_argument("--image", help="Screenshot to use instead of capturing the screen")
+    parser.add_argument("--frames", type=int, default=5)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("workers", help="OCR frames/sec against worker count")
+    p.add_argument("--counts", default="0,1,2,4,8")
+
+    p = sub.add_parser("backends", help="Per-call latency of each OCR backend")
+    p.add_argument("--calls", type=int, default=20)
+
+    sub.add_parser("capture", help="Time and peak memory from screenshot to OCR input")
+
+    p = sub.add_parser("handoff", help="Frame handoff cost to OCR processes: pickling against shared memory")
+    p.add_argument("--workers", type=int, default=4)
+
+    p = sub.add_parser("grab", help="Grab latency of each capture backend")
+    p.add_argument("--source", help="Recorded frames for the replay backend (defaults to --image)")
+
+    p = sub.add_parser("lag", help="Event loop lag with the vision pipeline in this process and in a child process")
+    p.add_argument("--source", help="Recorded frames for the replay backend (defaults to --image)")
+    p.add_argument("--seconds", type=float, default=10.0)
+
+    p = sub.add_parser("match", help="Threat matching: per-pattern regex loop against the single-pass matcher")
+    p.add_argument("--calls", type=int, default=200)
+
+    p = sub.add_parser("phrases", help="Phrase matching throughput per backend at 10, 1k and 100k phrases")
+    p.add_argument("--calls", type=int, default=20)
+    p.add_argument("--counts", default="10,1000,100000")
+
+    p = sub.add_parser("preprocess", help="OCR time and word recall per preprocessing step on a corpus")
+    p.add_argument("corpus", help="Directory of screenshots, each with a .txt file of the expected text")
+    p.add_argument("--dpi-scale", type=float, default=2.0)
+
+    args = parser.parse_args()
+    if args.bench == "grab":
+        bench_grab(max(args.frames, 20), args.source or args.image)
+        raise SystemExit
+    if args.bench == "lag":
+        bench_lag(args.source or args.image, args.seconds)
+        raise SystemExit
+    if args.bench == "match":
+        bench_match(args.calls)
+        raise SystemExit
+    if args.bench == "phrases":
+        bench_phrases(args.calls, [int(c) for c in args.counts.split(",")])
+        raise SystemExit
+    if args.bench == "preprocess":
+        bench_preprocess(load_corpus(args.corpus), args.dpi_scale)
+        raise SystemExit
+    frame = load_frame(args.image)
+    gray = GrayConverter().convert(frame)
+    if args.bench == "workers":
+        bench_workers(gray, [int(c) for c in args.counts.split(",")], args.frames)
+    elif args.bench == "backends":
+        bench_backends(gray, args.calls)
+    elif args.bench == "capture":
+        bench_capture(frame, args.frames)
+    elif args.bench == "handoff":
+        bench_handoff(gray, max(args.frames, 20), args.workers)
@@ -1,11 +1,64 @@
+import os
 import re
 import logging
 from core.overlay import overlay
+from core.ocr_result import OcrWords
+from core.threat_matcher import SEVERITIES, ThreatMatcher, literal_text
 
 logger = logging.getLogger(__name__)
 
+# Threat patterns
+RED_PATTERNS = [
+    r"account suspended",
+    r"immediate action required",
+    r"verify your account immediately",
+    r"netflix-verify\.tk",
+    r"bank-verify",
+]
+
+YELLOW_PATTERNS = [
+    r"urgent",
+    r"one-time password",
+    r"otp",
+    r"click here",
+    r"payment needed"
+]
+
+# Confidence reported for each risk level
+CONFIDENCE = {"RED": 0.95, "YELLOW": 0.60, "GREEN": 0.0}
+
+
+def load_signatures(path):
+    """Reads a phrase list: one "<RED|YELLOW> <phrase>" per line, blank lines and # comments ignored.
+
+    Phrases are plain text, matched case-insensitively with any run of
+    whitespace standing for a space; regexes belong in the lists above.
+    """
+    signatures = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            severity, _, phrase = line.partition(" ")
+            severity, phrase = severity.upper(), " ".join(phrase.split())
+            if severity not in SEVERITIES or not phrase:
+                logger.warning(f"{path}:{number}: expected '<RED|YELLOW> <phrase>', skipping line")
+                continue
+            signatures.append((severity, re.escape(phrase)))
+    logger.info(f"Loaded {len(signatures)} threat phrases from {path}")
+    return signatures
+
+
 class AIEngine:
-    def __init__(self):
+    def __init__(self, signature_file=None):
+        signatures = [("RED", p) for p in RED_PATTERNS] + [("YELLOW", p) for p in YELLOW_PATTERNS]
+        # Extra phrases, possibly many thousands (the vision process inherits AEGIS_SIGNATURES)
+        signature_file = signature_file or os.environ.get("AEGIS_SIGNATURES")
+        if signature_file:
+            signatures += load_signatures(signature_file)
+        # Every signature is compiled once; one pass over the text finds all of them
+        self.matcher = ThreatMatcher(signatures)
         self.current_risk = "GREEN"
         self.threat_confidence = 0.0
         self.recent_alerts = []
@@ -18,68 +71,82 @@ class AIEngine:
         # Fallback for old calls
         self.analyze_text_with_boxes(text, [])
 
-    def analyze_text_with_boxes(self, text: str, boxes: list):
+    def threat_patterns(self):
+        """The built-in regex patterns (used to steer the cheap OCR pass).
+
+        Phrases from a signature file are left out: the sentinel compares every
+        word against every term, which does not scale to thousands of phrases.
+        """
+        return RED_PATTERNS + YELLOW_PATTERNS
+
+    def analyze_text_with_boxes(self, text: str, boxes, incremental=False):
+        """`boxes` is an OcrWords (or a list of (word, x, y, w, h) tuples) whose words make up `text`.
+
+        With incremental=True the text is only what changed on screen, so a hit
+        in it never lowers the current risk and finding nothing does not clear
+        it (see revalidate).
+        """
         text_lower = text.lower()
-        
-        # Threat patterns
-        red_patterns = [
-            r"account suspended",
-            r"immediate action required",
-            r"verify your account immediately",
-            r"netflix-verify\.tk",
-            r"bank-verify",
-        ]
-        
-        yellow_patterns = [
-            r"urgent",
-            r"one-time password",
-            r"otp",
-            r"click here",
-            r"payment needed"
-        ]
-        
+        hits = self.matcher.find_all(text_lower)
+
         risk = "GREEN"
         confidence = 0.0
         message = ""
         speech_warning = ""
 
-        # Check RED
-        for p in red_patterns:
-            if re.search(p, text_lower):
-                risk = "RED"
-                confidence = 0.95
+        worst = ThreatMatcher.worst(hits)
+        if worst is not None:
+            risk, p = worst[0], worst[1]
+            # Literal signatures are shown as the text they match
+            p = literal_text(p) or p
+            confidence = CONFIDENCE[risk]
+            if risk == "RED":
                 message = f"Phishing attempt detected: Found high-risk phrase '{p.replace('.*', '')}'"
                 speech_warning = "Excuse me, I've detected a high-risk phishing attempt on your screen. I strongly advise against interacting with it."
-                break
-                
-        # Check YELLOW if not RED
-        if risk == "GREEN":
-            for p in yellow_patterns:
-                if re.search(p, text_lower):
-                    risk = "YELLOW"
-                    confidence = 0.60
-                    message = f"Suspicious activity: Found caution phrase '{p}'"
-                    speech_warning = "Caution, I've noticed suspicious or urgent language on your screen. Please be careful."
-                    break
+            else:
+                message = f"Suspicious activity: Found caution phrase '{p}'"
+                speech_warning = "Caution, I've noticed suspicious or urgent language on your screen. Please be careful."
 
         if risk != "GREEN":
+            previous = self.current_risk
             self.add_alert(risk, confidence, message)
+            if incremental and previous in SEVERITIES and SEVERITIES.index(previous) < SEVERITIES.index(risk):
+                # The rest of the screen may still show the more severe threat
+                self.current_risk, self.threat_confidence = previous, CONFIDENCE[previous]
             
             # Highlight detected words on screen
-            if boxes:
-                # Find which boxes contain the matched pattern (simplified to any part of pattern)
-                matched_words = [w for w in message.split("'")[1].split() if len(w) > 3] if "'" in message else []
-                for (word, x, y, w, h) in boxes:
-                    if word.lower() in text_lower and any(mw.lower() in word.lower() for mw in matched_words):
-                        overlay.draw_highlight(x, y, w, h, risk=risk, duration=5.0)
+            words = OcrWords.from_boxes(boxes)
+            if len(words):
+                # Hits are spans of the joined word string; usually that is `text` itself
+                words_lower = words.text.lower()
+                if words_lower != text_lower:
+                    hits = self.matcher.find_all(words_lower)
+                # Every hit at the alert's level maps back to the words it spans
+                for severity, _, start, end in hits:
+                    if severity != risk:
+                        continue
+                    for i in words.overlapping(start, end).tolist():
+                        overlay.draw_highlight(int(words.x[i]), int(words.y[i]), int(words.w[i]), int(words.h[i]),
+                                               risk=risk, duration=5.0)
 
             if self.audio_engine:
                 self.audio_engine.speak(speech_warning)
-        else:
+        elif not incremental:
             self.current_risk = "GREEN"
             self.threat_confidence = 0.0
             logger.info("No threats detected.")
 
+    def revalidate(self, text: str):
+        """Sets a raised risk to the worst threat still in the full screen text, GREEN once none is left"""
+        if self.current_risk == "GREEN":
+            return
+        worst = ThreatMatcher.worst(self.matcher.find_all(text.lower()))
+        risk = worst[0] if worst is not None else "GREEN"
+        if risk != self.current_risk:
+            self.current_risk = risk
+            self.threat_confidence = CONFIDENCE[risk]
+            logger.info(f"Risk level now {risk} (full screen text)." if worst is not None else "Threat no longer on screen.")
+
     def add_alert(self, risk_level: str, confidence: float, message: str):
         self.current_risk = risk_level
         self.threat_confidence = confidence
@@ -12,9 +12,11 @@ from core.app_launcher import AppLauncher
 logger = logging.getLogger(__name__)
 
 class AudioEngine:
-    def __init__(self, ai_engine):
+    def __init__(self, ai_engine, governor=None):
         self.ai_engine = ai_engine
         self.ai_engine.set_audio_engine(self)
+        # CPU time of listening and speech counts against the monitoring budget (see core.governor)
+        self.governor = governor
         self.app_launcher = AppLauncher()
         self.running = False
         self.thread = None
@@ -84,7 +86,13 @@ class AudioEngine:
             logger.error(f"Could not initialize microphone: {e}. Voice input disabled. Using mock timer instead.")
             has_mic = False
 
+        cpu_start = time.thread_time()
         while self.running:
+            if self.governor is not None:
+                # CPU time of the previous round (recording, recognition, command handling)
+                now = time.thread_time()
+                self.governor.account("audio", now - cpu_start)
+                cpu_start = now
             if not has_mic:
                 time.sleep(5)
                 # Mock a voice interaction to test the flow
@@ -173,12 +181,15 @@ class AudioEngine:
         logger.info(f"[FRIDAY SPEAKS]: {text}")
         if self.tts:
             def _speak():
+                cpu_start = time.thread_time()
                 try:
                     engine = pyttsx3.init()
                     engine.say(text)
                     engine.runAndWait()
                 except Exception as e:
                     logger.error(f"TTS Error in thread: {e}")
+                if self.governor is not None:
+                    self.governor.account("speech", time.thread_time() - cpu_start)
             threading.Thread(target=_speak, daemon=True).start()
 
     def start(self):
@@ -0,0 +1,37 @@
+import numpy as np
+
+# ITU-R BT.601 luma weights scaled to sum to 256, in B, G, R order
+GRAY_WEIGHTS = (29, 150, 77)
+
+
+def frame_view(screenshot):
+    """Wraps an mss screenshot's raw BGRA buffer as a (height, width, 4) array without copying"""
+    return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+
+class GrayConverter:
+    """Converts BGRA frames to contiguous 8-bit grayscale.
+
+    The uint16 scratch buffers are kept between frames so a conversion only
+    allocates its output.
+    """
+
+    def __init__(self):
+        self.acc = None
+        self.tmp = None
+
+    def convert(self, bgra):
+        shape = bgra.shape[:2]
+        if self.acc is None or self.acc.shape != shape:
+            self.acc = np.empty(shape, dtype=np.uint16)
+            self.tmp = np.empty(shape, dtype=np.uint16)
+        acc, tmp = self.acc, self.tmp
+        b, g, r = GRAY_WEIGHTS
+        np.multiply(bgra[:, :, 0], b, out=acc, dtype=np.uint16)
+        np.multiply(bgra[:, :, 1], g, out=tmp, dtype=np.uint16)
+        np.add(acc, tmp, out=acc)
+        np.multiply(bgra[:, :, 2], r, out=tmp, dtype=np.uint16)
+        np.add(acc, tmp, out=acc)
+        gray = np.empty(shape, dtype=np.uint8)
+        np.right_shift(acc, 8, out=gray, casting='unsafe')
+        return gray
@@ -0,0 +1,433 @@
+import os
+import glob
+import time
+import ctypes
+import ctypes.util
+import logging
+import threading
+import zipfile
+import mss
+import numpy as np
+from PIL import Image
+from core.capture import frame_view
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureUnavailable(RuntimeError):
+    """Raised when a capture backend cannot run on this machine"""
+
+
+class CaptureBackend:
+    """Grabs mss-style {left, top, width, height} screen areas as BGRA arrays and tracks grab latency.
+
+    `monitors` follows the mss layout: index 0 is the bounding box of all
+    monitors, 1.. are the individual monitors. grab() is called from a single
+    thread; release() may come from another one.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.monitors = []
+        self.grabs = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+
+    def grab(self, rect):
+        start = time.perf_counter()
+        frame = self._grab(rect)
+        latency = time.perf_counter() - start
+        self.grabs += 1
+        self.last_latency = latency
+        self.avg_latency = latency if self.grabs == 1 else 0.9 * self.avg_latency + 0.1 * latency
+        return frame
+
+    def _grab(self, rect):
+        raise NotImplementedError
+
+    def release(self, frame):
+        """Hands back a frame from grab() once its pixels have been read (backends reusing buffers need it)"""
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        return {
+            "backend": self.name,
+            "grabs": self.grabs,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": self.avg_latency * 1000,
+        }
+
+
+class MssBackend(CaptureBackend):
+    """mss screenshots (GDI BitBlt on Windows, XGetImage on Linux, CoreGraphics on macOS)"""
+
+    name = "mss"
+
+    def __init__(self, **options):
+        super().__init__()
+        self.sct = mss.mss()
+        self.monitors = self.sct.monitors
+
+    def _grab(self, rect):
+        # Zero-copy view of the screenshot's BGRA buffer
+        return frame_view(self.sct.grab(rect))
+
+    def close(self):
+        self.sct.close()
+
+
+# --- X11 MIT-SHM through ctypes -------------------------------------------
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; the rest of the struct is never touched
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+ZPIXMAP = 2
+ALL_PLANES = ctypes.c_ulong(-1).value
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+# X errors are reported through one process-wide handler; they are counted per
+# display, since every monitor's capture thread opens its own
+_x_errors = {}
+_x_errors_lock = threading.Lock()
+
+
+@_X_ERROR_HANDLER
+def _on_x_error(display, event):
+    with _x_errors_lock:
+        _x_errors[display] = _x_errors.get(display, 0) + 1
+    return 0
+
+
+def _take_x_errors(display):
+    """Number of X errors reported for `display` since the last call"""
+    with _x_errors_lock:
+        return _x_errors.pop(display, 0)
+
+
+def _load_library(name):
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise CaptureUnavailable(f"lib{name} not found")
+    return ctypes.CDLL(path)
+
+
+class XShmBackend(CaptureBackend):
+    """X11 capture through the MIT-SHM extension: the X server writes straight into shared memory.
+
+    Unlike XGetImage (what mss uses on Linux) no pixels travel over the X socket
+    and nothing is allocated per frame. A grab writes into one of `buffers`
+    segments that no unreleased frame uses, waiting for release() when all
+    are taken, so it should be at least the number of frames alive in the
+    pipeline at once.
+    """
+
+    name = "xshm"
+
+    def __init__(self, buffers=3, display=None, **options):
+        super().__init__()
+        self.x11 = _load_library("X11")
+        self.xext = _load_library("Xext")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare()
+
+        self.display = self.x11.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise CaptureUnavailable("Cannot open the X display")
+        if not self.xext.XShmQueryExtension(self.display):
+            self.x11.XCloseDisplay(self.display)
+            raise CaptureUnavailable("X server has no MIT-SHM extension")
+        # The default handler exits the process on any X error (e.g. SHM on a remote display)
+        self.x11.XSetErrorHandler(_on_x_error)
+
+        with mss.mss() as sct:
+            self.monitors = sct.monitors
+        self.root = self.x11.XDefaultRootWindow(self.display)
+        self.segments = []
+        try:
+            for _ in range(max(1, buffers)):
+                self.segments.append(self._create_segment())
+        except Exception:
+            self.close()
+            raise
+        self.free = list(self.segments)
+        self.leased = {}  # id of a grabbed frame -> its segment
+        self.cond = threading.Condition()
+
+    def _declare(self):
+        x11, xext, libc = self.x11, self.xext, self.libc
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDestroyImage.argtypes = [ctypes.c_void_p]
+        x11.XSetErrorHandler.restype = ctypes.c_void_p
+        x11.XSetErrorHandler.argtypes = [_X_ERROR_HANDLER]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_char_p, ctypes.POINTER(_XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def _create_segment(self):
+        """One shared-memory XImage as large as the largest monitor"""
+        x11, xext, libc = self.x11, self.xext, self.libc
+        screen = x11.XDefaultScreen(self.display)
+        monitors = self.monitors[1:] or self.monitors
+        width, height = max(m["width"] for m in monitors), max(m["height"] for m in monitors)
+        info = _XShmSegmentInfo()
+        image = xext.XShmCreateImage(self.display, x11.XDefaultVisual(self.display, screen),
+                                     x11.XDefaultDepth(self.display, screen), ZPIXMAP, None,
+                                     ctypes.byref(info), width, height)
+        if not image:
+            raise CaptureUnavailable("XShmCreateImage failed")
+        if image.contents.bits_per_pixel != 32:
+            x11.XDestroyImage(image)
+            raise CaptureUnavailable(f"Unsupported pixel format ({image.contents.bits_per_pixel} bpp)")
+        stride = image.contents.bytes_per_line
+        size = stride * height
+        info.shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            x11.XDestroyImage(image)
+            raise CaptureUnavailable(f"shmget failed (errno {ctypes.get_errno()})")
+        address = libc.shmat(info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(info.shmid, IPC_RMID, None)
+            x11.XDestroyImage(image)
+            raise CaptureUnavailable(f"shmat failed (errno {ctypes.get_errno()})")
+        info.shmaddr = address
+        info.readOnly = 0
+        image.contents.data = address
+        _take_x_errors(self.display)
+        xext.XShmAttach(self.display, ctypes.byref(info))
+        x11.XSync(self.display, 0)
+        # Removed as soon as both sides detach, so a crash does not leak the segment
+        libc.shmctl(info.shmid, IPC_RMID, None)
+        segment = {"image": image, "info": info, "width": width, "height": height,
+                   "buffer": np.frombuffer((ctypes.c_ubyte * size).from_address(address), dtype=np.uint8)}
+        if _take_x_errors(self.display):
+            self._destroy_segment(segment, attached=False)
+            raise CaptureUnavailable("XShmAttach failed (remote display?)")
+        return segment
+
+    def _grab(self, rect):
+        width, height = rect["width"], rect["height"]
+        if width > self.segments[0]["width"] or height > self.segments[0]["height"]:
+            raise ValueError(f"{rect} is larger than a monitor")
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.free, timeout=1.0):
+                raise RuntimeError("Every shared-memory buffer holds an unreleased frame")
+            segment = self.free.pop()
+        try:
+            # Shrinking the image header makes the server fill only the requested area
+            image = segment["image"].contents
+            image.width, image.height = width, height
+            x, y = rect["left"] - self.monitors[0]["left"], rect["top"] - self.monitors[0]["top"]
+            _take_x_errors(self.display)
+            ok = self.xext.XShmGetImage(self.display, self.root, segment["image"], x, y, ALL_PLANES)
+            if not ok or _take_x_errors(self.display):
+                raise RuntimeError(f"XShmGetImage failed for {rect}")
+        except Exception:
+            with self.cond:
+                self.free.append(segment)
+                self.cond.notify()
+            raise
+        # The server pads rows for the requested width (32 bpp: none), not to the segment's bytes_per_line
+        frame = segment["buffer"][:height * width * 4].reshape(height, width, 4)
+        with self.cond:
+            self.leased[id(frame)] = segment
+        return frame
+
+    def release(self, frame):
+        with self.cond:
+            segment = self.leased.pop(id(frame), None)
+            if segment is not None:
+                self.free.append(segment)
+                self.cond.notify()
+
+    def _destroy_segment(self, segment, attached=True):
+        if attached:
+            self.xext.XShmDetach(self.display, ctypes.byref(segment["info"]))
+            self.x11.XSync(self.display, 0)
+        self.libc.shmdt(segment["info"].shmaddr)
+        # XDestroyImage would free() the shared memory otherwise
+        segment["image"].contents.data = None
+        self.x11.XDestroyImage(segment["image"])
+
+    def close(self):
+        if not self.display:
+            return
+        for segment in self.segments:
+            self._destroy_segment(segment)
+        self.segments = []
+        self.x11.XCloseDisplay(self.display)
+        _take_x_errors(self.display)
+        self.display = None
+
+
+# --- Recorded frames -------------------------------------------------------
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".npy")
+TIMESTAMPS_FILE = "timestamps.txt"
+
+
+def as_bgra(frame):
+    """Grayscale frames are expanded to BGRA; BGRA frames are returned as is"""
+    if frame.ndim == 2:
+        return np.repeat(frame[:, :, None], 4, axis=2)
+    return frame
+
+
+def load_bgra(path):
+    """Reads an image file (or a .npy array) as a BGRA frame"""
+    if path.endswith(".npy"):
+        return as_bgra(np.load(path))
+    rgba = np.asarray(Image.open(path).convert("RGBA"))
+    return np.ascontiguousarray(rgba[:, :, [2, 1, 0, 3]])
+
+
+def write_archive(path, frames, timestamps=None):
+    """Writes BGRA or grayscale frames, and optionally their capture times, to a compressed .npz archive.
+
+    Frames are streamed into the archive one by one, so `frames` can be a generator.
+    """
+    count = 0
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for frame in frames:
+            with archive.open(f"frame_{count:06d}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.ascontiguousarray(frame))
+            count += 1
+        if timestamps is not None:
+            with archive.open("timestamps.npy", "w") as f:
+                np.lib.format.write_array(f, np.asarray(timestamps, dtype=np.float64))
+    return count
+
+
+class ReplayBackend(CaptureBackend):
+    """Plays back recorded screenshots: every grab returns the next one, cropped to the requested area.
+
+    `source` is a directory of images (sorted by name, with an optional
+    timestamps.txt holding one capture time per line), a single image, or a
+    compressed .npz frame archive from write_archive(). The recording is one
+    monitor the size of its first frame. Runs headless.
+    """
+
+    name = "replay"
+
+    def __init__(self, source=None, loop=True, **options):
+        super().__init__()
+        if source is None:
+            raise CaptureUnavailable("The replay backend needs a source")
+        self.archive = None
+        self.paths = []
+        self.timestamps = None
+        if source.endswith(".npz"):
+            # Frames are decompressed one at a time, when they are grabbed
+            self.archive = np.load(source)
+            self.paths = sorted(k for k in self.archive.files if k.startswith("frame_"))
+            if "timestamps" in self.archive.files:
+                self.timestamps = self.archive["timestamps"].tolist()
+        elif os.path.isdir(source):
+            self.paths = sorted(p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+            timestamps = os.path.join(source, TIMESTAMPS_FILE)
+            if os.path.exists(timestamps):
+                with open(timestamps) as f:
+                    self.timestamps = [float(line) for line in f if line.strip()]
+        else:
+            self.paths = [source]
+        if not self.paths:
+            raise CaptureUnavailable(f"No frames found in {source}")
+        self.count = len(self.paths)
+        self.loop = loop
+        self.index = 0
+        height, width = self._load(0).shape[:2]
+        monitor = {"left": 0, "top": 0, "width": width, "height": height}
+        self.monitors = [dict(monitor), monitor]
+
+    def _load(self, index):
+        if self.archive is not None:
+            return as_bgra(self.archive[self.paths[index]])
+        return load_bgra(self.paths[index])
+
+    def timestamp(self, index):
+        """Capture time of a frame in seconds, or None when the recording has no timestamps"""
+        if self.timestamps is None or index >= len(self.timestamps):
+            return None
+        return self.timestamps[index]
+
+    def _grab(self, rect):
+        if self.index >= self.count:
+            if not self.loop:
+                raise EOFError("End of the recording")
+            self.index = 0
+        frame = self._load(self.index)
+        self.index += 1
+        return frame[rect["top"]:rect["top"] + rect["height"], rect["left"]:rect["left"] + rect["width"]]
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+
+
+BACKENDS = {
+    "mss": MssBackend,
+    "xshm": XShmBackend,
+    "replay": ReplayBackend,
+}
+
+
+def create_capture_backend(name="mss", **options):
+    """Creates a capture backend by name; "auto" prefers MIT-SHM on X11 and falls back to mss"""
+    if name != "auto":
+        return BACKENDS[name](**options)
+    if os.environ.get("DISPLAY"):
+        try:
+            return XShmBackend(**options)
+        except Exception as e:
+            logger.info(f"Shared-memory capture unavailable ({e}), falling back to mss.")
+    return MssBackend(**options)
@@ -0,0 +1,184 @@
+import threading
+import logging
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Each slot starts with a sequence number; frame pixels follow, cache-line aligned
+HEADER_BYTES = 64
+WRITING = -1
+
+# Slots attached by this process (OCR workers), by shared memory name
+_attached = {}
+
+
+class StaleFrame(RuntimeError):
+    """Raised when a frame slot was reused while a job was still reading it"""
+
+
+def _open(name):
+    """Attaches to an existing segment without handing it to the resource tracker.
+
+    The ring in the capture process owns the segments; a tracked attach would
+    unlink them when the worker exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _attached[name] = _open(name)
+    return shm
+
+
+def _detach(name):
+    shm = _attached.pop(name, None)
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still alive; the mapping goes away with it
+            pass
+
+
+def _free(shm):
+    _detach(shm.name)
+    shm.close()
+    shm.unlink()
+
+
+class SharedRegion:
+    """Picklable reference to a region of a frame in a shared-memory slot.
+
+    Only the slot name, sequence number and coordinates travel to the worker
+    process; the pixels are read in place through a NumPy view.
+    """
+
+    __slots__ = ("name", "seq", "frame_shape", "x0", "y0", "x1", "y1")
+
+    def __init__(self, name, seq, frame_shape, x0, y0, x1, y1):
+        self.name = name
+        self.seq = seq
+        self.frame_shape = frame_shape
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+
+    def __getstate__(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    @property
+    def shape(self):
+        return (self.y1 - self.y0, self.x1 - self.x0)
+
+    def _header(self, shm):
+        return int(np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0])
+
+    def view(self):
+        """Pixels of the region, without copying"""
+        shm = _attach(self.name)
+        if self._header(shm) != self.seq:
+            raise StaleFrame(f"Frame {self.seq} was overwritten")
+        frame = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=shm.buf, offset=HEADER_BYTES)
+        return frame[self.y0:self.y1, self.x0:self.x1]
+
+    def verify(self):
+        """Raises StaleFrame if the slot was reused since view() (the pixels read may be torn)"""
+        if self._header(_attach(self.name)) != self.seq:
+            raise StaleFrame(f"Frame {self.seq} was overwritten while it was read")
+
+
+class FrameRef:
+    """A frame written to a slot of a FrameRing; hands out SharedRegions until released"""
+
+    def __init__(self, index, name, seq, shape):
+        self.index = index
+        self.name = name
+        self.seq = seq
+        self.shape = shape
+
+    def region(self, x0, y0, x1, y1):
+        return SharedRegion(self.name, self.seq, self.shape, x0, y0, x1, y1)
+
+
+class FrameRing:
+    """Small ring of shared-memory slots for handing grayscale frames to OCR worker processes.
+
+    The frame is copied once into a free slot; OCR jobs then carry a few
+    dozen bytes (SharedRegion) instead of pickled pixels. A slot stays busy
+    until released, and its sequence number lets readers detect reuse.
+    """
+
+    def __init__(self, slots=4):
+        self.slots = [None] * slots  # SharedMemory per slot, allocated on first use
+        self.busy = set()
+        self.seq = 0
+        self.writes = 0
+        self.fallbacks = 0
+        self.cond = threading.Condition()
+
+    def _slot(self, index, nbytes):
+        shm = self.slots[index]
+        if shm is None or shm.size < HEADER_BYTES + nbytes:
+            if shm is not None:
+                _free(shm)
+            shm = self.slots[index] = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + nbytes)
+        return shm
+
+    def write(self, frame, timeout=1.0):
+        """Copies a 2-D uint8 frame into a free slot and returns its FrameRef, or None if every slot stays busy"""
+        with self.cond:
+            if not self.cond.wait_for(lambda: len(self.busy) < len(self.slots), timeout):
+                self.fallbacks += 1
+                return None
+            index = next(i for i in range(len(self.slots)) if i not in self.busy)
+            self.busy.add(index)
+            self.seq += 1
+            seq = self.seq
+        try:
+            shm = self._slot(index, frame.nbytes)
+        except Exception:
+            self.release(FrameRef(index, None, seq, frame.shape))
+            raise
+        header = np.ndarray((1,), dtype=np.int64, buffer=shm.buf)
+        header[0] = WRITING
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf, offset=HEADER_BYTES)[...] = frame
+        header[0] = seq
+        self.writes += 1
+        return FrameRef(index, shm.name, seq, frame.shape)
+
+    def release(self, ref):
+        with self.cond:
+            self.busy.discard(ref.index)
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            for i, shm in enumerate(self.slots):
+                if shm is not None:
+                    _free(shm)
+                    self.slots[i] = None
+            self.busy.clear()
+
+    def get_stats(self):
+        with self.cond:
+            return {
+                "slots": len(self.slots),
+                "busy": len(self.busy),
+                "allocated_bytes": sum(shm.size for shm in self.slots if shm is not None),
+                "writes": self.writes,
+                "fallbacks": self.fallbacks,
+            }
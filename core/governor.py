@@ -0,0 +1,190 @@
+import os
+import sys
+import glob
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Cost profiles, cheapest last. Each level stretches capture intervals, lowers the
+# resolution of the OCR pass that reads the whole screen (lines escalated by the
+# sentinel stay at full resolution) and lets fewer OCR worker processes run at once.
+LEVELS = (
+    {"level": 0, "interval_scale": 1.0, "ocr_scale": 1, "worker_fraction": 1.0},
+    {"level": 1, "interval_scale": 2.0, "ocr_scale": 1, "worker_fraction": 1.0},
+    {"level": 2, "interval_scale": 2.0, "ocr_scale": 1, "worker_fraction": 0.5},
+    {"level": 3, "interval_scale": 4.0, "ocr_scale": 2, "worker_fraction": 0.5},
+    {"level": 4, "interval_scale": 8.0, "ocr_scale": 2, "worker_fraction": 0.25},
+    {"level": 5, "interval_scale": 16.0, "ocr_scale": 3, "worker_fraction": 0.25},
+)
+
+# Reduced-cost profile used at least while on battery
+BATTERY_LEVEL = 2
+
+
+def on_battery():
+    """True on battery power, False on AC power, None when it cannot be told"""
+    if psutil is not None:
+        try:
+            battery = psutil.sensors_battery()
+            if battery is not None:
+                return not battery.power_plugged
+        except Exception:
+            pass
+    if sys.platform == "win32":
+        import ctypes
+
+        class SYSTEM_POWER_STATUS(ctypes.Structure):
+            _fields_ = [("ACLineStatus", ctypes.c_ubyte), ("BatteryFlag", ctypes.c_ubyte),
+                        ("BatteryLifePercent", ctypes.c_ubyte), ("SystemStatusFlag", ctypes.c_ubyte),
+                        ("BatteryLifeTime", ctypes.c_ulong), ("BatteryFullLifeTime", ctypes.c_ulong)]
+
+        status = SYSTEM_POWER_STATUS()
+        if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)) or status.ACLineStatus == 255:
+            return None
+        return status.ACLineStatus == 0
+    # Linux: any mains adapter reports whether it is plugged in
+    online = []
+    for supply in glob.glob("/sys/class/power_supply/*"):
+        try:
+            with open(os.path.join(supply, "type")) as f:
+                if f.read().strip() != "Mains":
+                    continue
+            with open(os.path.join(supply, "online")) as f:
+                online.append(f.read().strip() == "1")
+        except OSError:
+            continue
+    return not any(online) if online else None
+
+
+class CpuGovernor:
+    """Keeps background monitoring under a CPU budget, as a fraction of one core averaged over `window` seconds.
+
+    Stages report the CPU time they used with account() (thread CPU time for
+    pipeline stages and the audio loop, process CPU time for OCR workers). Every
+    `period` seconds the governor moves one level up the LEVELS ladder while
+    usage is over budget, and one level down once usage falls below
+    `headroom` times the budget. Listeners get the new profile on every change.
+    On battery the budget drops to `battery_budget` and the level never goes
+    below BATTERY_LEVEL.
+    """
+
+    def __init__(self, budget=0.05, battery_budget=None, window=60.0, period=5.0, hold=15.0, headroom=0.5,
+                 power_source=on_battery):
+        self.budget = budget
+        self.battery_budget = battery_budget if battery_budget is not None else budget / 2
+        self.period = period
+        # Let a change show up in the measurements before making the next one
+        self.hold = hold
+        self.headroom = headroom
+        self.power_source = power_source
+        self.level = 0
+        self.on_battery = None
+        self.last_change = 0.0
+        self.pending = {}  # stage -> CPU seconds since the last tick
+        self.buckets = deque(maxlen=max(1, int(window / period)))  # (wall seconds, {stage: CPU seconds})
+        self.last_tick = time.monotonic()
+        self.listeners = []
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def account(self, stage, seconds):
+        with self.lock:
+            self.pending[stage] = self.pending.get(stage, 0.0) + seconds
+
+    def profile(self):
+        return LEVELS[self.level]
+
+    def add_listener(self, callback):
+        """callback(profile) is called from the governor thread whenever the level changes"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _usage(self):
+        wall = sum(seconds for seconds, _ in self.buckets)
+        if not wall:
+            return 0.0, {}
+        stages = {}
+        for _, cpu in self.buckets:
+            for stage, seconds in cpu.items():
+                stages[stage] = stages.get(stage, 0.0) + seconds
+        return sum(stages.values()) / wall, {stage: seconds / wall for stage, seconds in stages.items()}
+
+    def tick(self):
+        """Closes the current measurement period and adjusts the level"""
+        now = time.monotonic()
+        with self.lock:
+            self.buckets.append((now - self.last_tick, self.pending))
+            self.pending = {}
+            self.last_tick = now
+            usage, _ = self._usage()
+        self.on_battery = self.power_source() if self.power_source else None
+        budget = self.battery_budget if self.on_battery else self.budget
+        floor = BATTERY_LEVEL if self.on_battery else 0
+        level = self.level
+        if level < floor:
+            level = floor
+        elif now - self.last_change >= self.hold:
+            if usage > budget and level < len(LEVELS) - 1:
+                level += 1
+            elif usage < budget * self.headroom and level > floor:
+                level -= 1
+        if level != self.level:
+            logger.info(f"CPU use {usage:.1%} of a core against a budget of {budget:.1%}: "
+                        f"cost level {self.level} -> {level}{' (on battery)' if self.on_battery else ''}")
+            self.level = level
+            self.last_change = now
+            for callback in list(self.listeners):
+                try:
+                    callback(self.profile())
+                except Exception as e:
+                    logger.error(f"Error applying cost level {level}: {e}")
+
+    def _run(self):
+        while self.running:
+            self.wakeup.wait(self.period)
+            if self.running:
+                self.tick()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.last_tick = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="governor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.wakeup.clear()
+
+    def get_stats(self):
+        with self.lock:
+            usage, stages = self._usage()
+            window = sum(seconds for seconds, _ in self.buckets)
+        budget = self.battery_budget if self.on_battery else self.budget
+        return {
+            "budget": budget,
+            "usage": usage,
+            "used_fraction": usage / budget if budget else 0.0,
+            "stages": stages,
+            "window_s": window,
+            "on_battery": self.on_battery,
+            "profile": dict(self.profile()),
+        }
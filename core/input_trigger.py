@@ -0,0 +1,130 @@
+import threading
+import time
+import logging
+
+try:
+    from pynput import keyboard, mouse
+except Exception:  # ImportError, or no display server to hook into
+    keyboard = mouse = None
+
+logger = logging.getLogger(__name__)
+
+
+class InputActivityMonitor:
+    """Turns mouse clicks, scrolls, key bursts and window switches into capture triggers.
+
+    on_activity(reason) is called once per burst of input: `debounce` seconds after
+    the input settles, but never later than `max_delay` after it started.
+    """
+
+    def __init__(self, on_activity, debounce=0.25, max_delay=1.0, key_burst=4, burst_window=1.5, idle_after=60.0):
+        self.on_activity = on_activity
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.key_burst = key_burst
+        self.burst_window = burst_window
+        self.idle_after = idle_after
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.timer = None
+        self.first_event = 0.0
+        self.last_event = time.monotonic()
+        self.reason = None
+        self.key_times = []
+        self.alt_down = False
+        self.triggers = {}
+
+    def _activity(self, reason):
+        now = time.monotonic()
+        with self.lock:
+            self.last_event = now
+            if self.timer is None:
+                self.first_event = now
+                self.reason = reason
+                self.timer = threading.Timer(self.debounce, self._fire)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _fire(self):
+        with self.lock:
+            now = time.monotonic()
+            settle = self.last_event + self.debounce - now
+            deadline = self.first_event + self.max_delay - now
+            if settle > 0 and deadline > 0:
+                # Input is still coming in (e.g. a long scroll), wait for it to settle
+                self.timer = threading.Timer(min(settle, deadline), self._fire)
+                self.timer.daemon = True
+                self.timer.start()
+                return
+            self.timer = None
+            reason = self.reason
+            self.triggers[reason] = self.triggers.get(reason, 0) + 1
+        try:
+            self.on_activity(reason)
+        except Exception as e:
+            logger.error(f"Error in input trigger: {e}")
+
+    def _on_click(self, x, y, button, pressed):
+        if pressed:
+            self._activity("click")
+
+    def _on_scroll(self, x, y, dx, dy):
+        self._activity("scroll")
+
+    def _on_press(self, key):
+        if key in (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r):
+            self.alt_down = True
+        elif key in (keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r) or (self.alt_down and key == keyboard.Key.tab):
+            # Alt+Tab / Win / Cmd usually means the foreground window is changing
+            self._activity("window")
+            return
+        now = time.monotonic()
+        self.key_times = [t for t in self.key_times if now - t < self.burst_window]
+        self.key_times.append(now)
+        if len(self.key_times) >= self.key_burst or key == keyboard.Key.enter:
+            self.key_times = []
+            self._activity("keys")
+
+    def _on_release(self, key):
+        if key in (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r):
+            self.alt_down = False
+
+    def is_idle(self):
+        """True when there has been no input for idle_after seconds"""
+        return bool(self.listeners) and time.monotonic() - self.last_event > self.idle_after
+
+    def start(self):
+        if mouse is None or keyboard is None:
+            logger.warning("pynput unavailable. Input-triggered capture disabled.")
+            return False
+        self.last_event = time.monotonic()
+        try:
+            self.listeners = [
+                mouse.Listener(on_click=self._on_click, on_scroll=self._on_scroll),
+                keyboard.Listener(on_press=self._on_press, on_release=self._on_release),
+            ]
+            for listener in self.listeners:
+                listener.daemon = True
+                listener.start()
+        except Exception as e:
+            logger.warning(f"Could not hook input events: {e}. Input-triggered capture disabled.")
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        for listener in self.listeners:
+            listener.stop()
+        self.listeners = []
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+    def get_stats(self):
+        return {
+            "active": bool(self.listeners),
+            "idle": self.is_idle(),
+            "seconds_since_input": time.monotonic() - self.last_event,
+            "triggers": dict(self.triggers),
+        }
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from collections import deque
+import numpy as np
+
+
+class LoopLagMonitor:
+    """Measures asyncio event loop lag: how late a short sleep wakes up.
+
+    Anything that holds the loop thread or the GIL (blocking handlers, heavy
+    work on other threads) shows up as lag; websocket pushes are delayed by
+    the same amount.
+    """
+
+    def __init__(self, interval=0.1, window=600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # seconds late, most recent last
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def reset(self):
+        self.samples.clear()
+
+    def get_stats(self):
+        if not self.samples:
+            return {"samples": 0}
+        ms = np.asarray(self.samples) * 1000
+        return {
+            "samples": len(ms),
+            "interval_ms": self.interval * 1000,
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+        }
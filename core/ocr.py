@@ -0,0 +1,139 @@
+import os
+import time
+import threading
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from core.ocr_backend import OcrUnavailable, get_backend, set_backend
+from core.preprocess import downscale
+from core.ocr_result import OcrWords
+from core.frame_ring import SharedRegion
+
+logger = logging.getLogger(__name__)
+
+
+def ocr_pixels(pixels, x0, y0, scale=1, psm=None, preprocessor=None, word_filter=None):
+    """OCRs a grayscale region and returns its OcrWords, offset by (x0, y0).
+
+    With scale > 1 the region is downscaled first (cheap pass). The preprocessor
+    may downscale further; boxes are always scaled back to full-resolution coordinates.
+    The word filter (see core.word_filter) drops junk tokens before the result is sent back.
+    `pixels` may be a SharedRegion, read in place from a shared-memory frame.
+    """
+    region = None
+    if isinstance(pixels, SharedRegion):
+        region, pixels = pixels, pixels.view()
+    pixels = downscale(pixels, scale)
+    if preprocessor is not None:
+        pixels, factor = preprocessor.apply(pixels)
+        scale *= factor
+    data = get_backend().image_to_data(np.ascontiguousarray(pixels), psm=psm)
+    if region is not None:
+        region.verify()
+    return OcrWords.from_tesseract(data, x0, y0, scale, word_filter)
+
+def _ocr_timed(*job):
+    """ocr_pixels with the CPU time it took in this process and in the tesseract processes it ran"""
+    backend = get_backend()
+    start, children = time.process_time(), backend.child_cpu
+    words = ocr_pixels(*job)
+    return words, time.process_time() - start, backend.child_cpu - children
+
+
+def _init_worker(backend):
+    set_backend(backend)
+    # A worker blocks on the job queue forever if the process that owns the pool is
+    # killed (e.g. a crashed vision process); exit along with it
+    parent = multiprocessing.parent_process()
+    if parent is not None:
+        def exit_with_parent():
+            wait([parent.sentinel])
+            os._exit(1)
+        threading.Thread(target=exit_with_parent, daemon=True).start()
+
+
+class OcrPool:
+    """Runs OCR jobs on a bounded pool of worker processes.
+
+    With workers=0 jobs run inline on the calling thread. CPU time used by the
+    worker processes, and by the tesseract processes they start (pytesseract),
+    is added up in cpu_time and reported to on_cpu("ocr_workers", seconds);
+    tesseract processes started by inline OCR are reported as "ocr_inline".
+    """
+
+    def __init__(self, workers=None, backend="auto", on_cpu=None):
+        if workers is None:
+            workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.workers = workers
+        # Jobs allowed to run at once (CpuGovernor lowers it to spend less CPU per moment)
+        self.active_workers = workers
+        self.on_cpu = on_cpu
+        self.cpu_time = 0.0
+        # Each worker (or each calling thread, when inline) keeps its own engine loaded
+        self.backend = backend
+        set_backend(backend)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.workers > 0 and self.executor is None:
+                # Forking a process that already runs the event loop, input hooks and pipeline
+                # threads is not safe; spawned workers import only what the jobs need
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                    initargs=(self.backend,),
+                                                    mp_context=multiprocessing.get_context("spawn"))
+                logger.info(f"OCR pool started with {self.workers} workers.")
+
+    def stop(self, wait=False):
+        """With wait=True, returns once the workers have exited (needed right before this process exits)"""
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=wait, cancel_futures=True)
+                self.executor = None
+
+    def set_active_workers(self, count):
+        self.active_workers = max(1, min(count, self.workers))
+
+    def _account(self, stage, cpu):
+        self.cpu_time += cpu
+        if self.on_cpu is not None and cpu:
+            self.on_cpu(stage, cpu)
+
+    def _result(self, future):
+        words, cpu, children = future.result()
+        self._account("ocr_workers", cpu + children)
+        return words
+
+    def _inline(self, jobs):
+        results = []
+        for job in jobs:
+            words, _, children = _ocr_timed(*job)
+            # In-process OCR counts in the calling stage's thread time; tesseract processes do not
+            self._account("ocr_inline", children)
+            results.append(words)
+        return results
+
+    def map(self, jobs):
+        """Runs ocr_pixels for each (pixels, x0, y0[, scale, psm, preprocessor, word_filter]) job and returns the OcrWords, in order"""
+        executor = self.executor
+        if executor is None or len(jobs) < 2:
+            return self._inline(jobs)
+
+        # Keep at most two jobs per worker in flight so large frames do not
+        # queue every region (and its pixels) at once; with fewer active
+        # workers, only that many jobs run at the same time
+        results = [None] * len(jobs)
+        pending = {}
+        limit = self.workers * 2 if self.active_workers >= self.workers else self.active_workers
+        for i, job in enumerate(jobs):
+            if len(pending) >= limit:
+                j, future = next(iter(pending.items()))
+                results[j] = self._result(future)
+                del pending[j]
+            pending[i] = executor.submit(_ocr_timed, *job)
+        for j, future in pending.items():
+            results[j] = self._result(future)
+        return results
@@ -0,0 +1,174 @@
+import logging
+import os
+import sys
+import threading
+import time
+import numpy as np
+from PIL import Image
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Basic setup, may need exact path on Windows like:
+# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+
+class OcrUnavailable(RuntimeError):
+    """Raised when no OCR engine is installed (picklable, unlike TesseractNotFoundError)"""
+
+
+# Held while a pytesseract call measures the CPU time of its tesseract process
+_children_lock = threading.Lock()
+
+
+def _children_cpu():
+    """CPU time of this process's finished child processes (always 0 on Windows)"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class PytesseractBackend:
+    """Runs the tesseract executable once per call (temp file + fresh process).
+
+    child_cpu adds up the CPU time of those tesseract processes, which the
+    calling process's own CPU time does not include. The OS only reports it
+    for all children of the process together, so calls that measure it run
+    one at a time (threads of one process would count each other's
+    processes otherwise). Windows does not report it for finished processes;
+    there the call's wall time stands in for it (tesseract is CPU-bound).
+    """
+
+    name = "pytesseract"
+
+    def __init__(self):
+        self.child_cpu = 0.0
+
+    def image_to_data(self, pixels, psm=None):
+        """OCRs a grayscale (h, w) or RGB (h, w, 3) array and returns a pytesseract-style dict.
+
+        psm overrides Tesseract's page segmentation mode (e.g. 11 for sparse text).
+        """
+        # pytesseract still writes the image to a temp file for the tesseract process
+        img = Image.fromarray(pixels)
+        config = f"--psm {psm}" if psm is not None else ""
+        if sys.platform == "win32":
+            start = time.perf_counter()
+            try:
+                return self._image_to_data(img, config)
+            finally:
+                self.child_cpu += time.perf_counter() - start
+        with _children_lock:
+            children = _children_cpu()
+            try:
+                return self._image_to_data(img, config)
+            finally:
+                self.child_cpu += _children_cpu() - children
+
+    def _image_to_data(self, img, config):
+        try:
+            return pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
+        except pytesseract.TesseractNotFoundError:
+            raise OcrUnavailable("Tesseract not found")
+
+    def close(self):
+        pass
+
+
+class TesserocrBackend:
+    """Keeps one Tesseract engine loaded in this process and feeds it raw pixel buffers"""
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng"):
+        # Recognition runs in this process
+        self.child_cpu = 0.0
+        if tesserocr is None:
+            raise OcrUnavailable("tesserocr is not installed")
+        try:
+            self.api = tesserocr.PyTessBaseAPI(lang=lang)
+        except RuntimeError as e:
+            raise OcrUnavailable(f"Could not load Tesseract: {e}")
+        self.default_psm = self.api.GetPageSegMode()
+
+    def image_to_data(self, pixels, psm=None):
+        pixels = np.ascontiguousarray(pixels)
+        height, width = pixels.shape[:2]
+        bpp = pixels.shape[2] if pixels.ndim == 3 else 1
+        self.api.SetPageSegMode(self.default_psm if psm is None else psm)
+        # Raw buffer straight into the engine, no image file involved
+        self.api.SetImageBytes(pixels.tobytes(), width, height, bpp, width * bpp)
+        self.api.Recognize()
+
+        data = {'text': [], 'left': [], 'top': [], 'width': [], 'height': [], 'conf': []}
+        level = tesserocr.RIL.WORD
+        it = self.api.GetIterator()
+        if it is None:
+            return data
+        for word in tesserocr.iterate_level(it, level):
+            box = word.BoundingBox(level)
+            if box is None:
+                continue
+            x1, y1, x2, y2 = box
+            data['text'].append(word.GetUTF8Text(level) or "")
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+            data['conf'].append(word.Confidence(level))
+        return data
+
+    def close(self):
+        self.api.End()
+
+
+BACKENDS = {
+    "pytesseract": PytesseractBackend,
+    "tesserocr": TesserocrBackend,
+}
+
+# One engine per thread, created lazily and kept for the life of the thread: tesserocr
+# engines are not thread-safe, and with workers=0 (or a single job) every monitor's
+# OCR stage runs OCR on its own thread
+_local = threading.local()
+_backend_name = "auto"
+# Loading Tesseract's language data is not safe to do from several threads at once either
+_create_lock = threading.Lock()
+
+
+def create_backend(name="auto"):
+    if name != "auto":
+        return BACKENDS[name]()
+    try:
+        return TesserocrBackend()
+    except OcrUnavailable as e:
+        logger.info(f"Persistent OCR engine unavailable ({e}), falling back to pytesseract.")
+        return PytesseractBackend()
+
+
+def set_backend(name):
+    """Selects the backend for this process (also used as the OCR pool worker initializer)"""
+    global _backend_name
+    backend = getattr(_local, "backend", None)
+    if backend is not None and name != _local.name:
+        backend.close()
+        _local.backend = None
+    _backend_name = name
+
+
+def get_backend():
+    """This thread's engine for the selected backend"""
+    backend = getattr(_local, "backend", None)
+    if backend is None or _local.name != _backend_name:
+        if backend is not None:
+            backend.close()
+            _local.backend = None
+        name = _backend_name
+        with _create_lock:
+            backend = _local.backend = create_backend(name)
+        _local.name = name
+    return backend
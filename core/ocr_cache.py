@@ -0,0 +1,77 @@
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+# Rough per-entry overhead (object headers, dict slot, key) used for memory accounting
+ENTRY_OVERHEAD = 400
+
+
+class OcrCache:
+    """LRU cache of OCR results keyed by a hash of the region pixels.
+
+    Words are stored relative to the region origin so a dialog that reappears
+    somewhere else on screen still hits.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (OcrWords, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(pixels):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(pixels.shape).encode())
+        digest.update(np.ascontiguousarray(pixels))
+        return digest.digest()
+
+    def get(self, key, x=0, y=0):
+        """Returns cached OcrWords shifted to (x, y), or None on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].offset(x, y)
+
+    def put(self, key, words, x=0, y=0):
+        """Stores the OcrWords found in a region whose origin is at (x, y)"""
+        relative = words.offset(-x, -y)
+        size = ENTRY_OVERHEAD + relative.nbytes()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (relative, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
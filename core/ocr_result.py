@@ -0,0 +1,152 @@
+import numpy as np
+
+COLUMNS = ("x", "y", "w", "h", "conf")
+
+
+class OcrWords:
+    """Columnar OCR result: every word lives in one joined string (separated by
+    single spaces) and is addressed by its [start, end) offsets, with boxes and
+    confidences in parallel int32 arrays. `dropped` counts the tokens a word
+    filter removed while building it.
+    """
+
+    __slots__ = ("text", "starts", "ends", "dropped") + COLUMNS
+
+    def __init__(self, text="", starts=None, ends=None, x=None, y=None, w=None, h=None, conf=None, dropped=0):
+        empty = np.zeros(0, dtype=np.int32)
+        self.text = text
+        self.starts = empty if starts is None else starts
+        self.ends = empty if ends is None else ends
+        self.x = empty if x is None else x
+        self.y = empty if y is None else y
+        self.w = empty if w is None else w
+        self.h = empty if h is None else h
+        self.conf = empty if conf is None else conf
+        self.dropped = dropped
+
+    @staticmethod
+    def _offsets(words):
+        lengths = np.fromiter(map(len, words), dtype=np.int32, count=len(words))
+        # Each word is followed by one separator space
+        starts = np.zeros(len(words), dtype=np.int32)
+        if len(words) > 1:
+            np.cumsum(lengths[:-1] + 1, out=starts[1:])
+        return starts, starts + lengths
+
+    @classmethod
+    def from_words(cls, words, x, y, w, h, conf=None):
+        starts, ends = cls._offsets(words)
+        as32 = lambda a: np.asarray(a, dtype=np.int32)
+        conf = np.full(len(words), 100, dtype=np.int32) if conf is None else as32(conf)
+        return cls(" ".join(words), starts, ends, as32(x), as32(y), as32(w), as32(h), conf)
+
+    @classmethod
+    def from_tesseract(cls, data, x0=0, y0=0, scale=1, word_filter=None):
+        """Builds the columns straight from a pytesseract Output.DICT in one pass.
+
+        Without a word filter only tokens of 4 characters or more are kept.
+        """
+        texts = [t.strip() for t in data['text']]
+        # pytesseract reports confidences as floats (or strings in older versions)
+        conf = np.asarray(data['conf'], dtype=np.float32) if 'conf' in data else np.full(len(texts), 100.0)
+        if word_filter is not None:
+            keep = word_filter.keep(texts, conf)
+        else:
+            keep = np.fromiter((len(t) >= 4 for t in texts), dtype=bool, count=len(texts))
+        dropped = sum(1 for t in texts if t) - int(keep.sum())
+        words = [t for t, k in zip(texts, keep.tolist()) if k]
+        column = lambda name: np.asarray(data[name], dtype=np.int32)[keep]
+        result = cls.from_words(words, column('left') * scale + x0, column('top') * scale + y0,
+                                column('width') * scale, column('height') * scale, conf[keep].astype(np.int32))
+        result.dropped = dropped
+        return result
+
+    @classmethod
+    def from_boxes(cls, boxes):
+        """Builds from the older list of (word, x, y, w, h) tuples"""
+        if isinstance(boxes, OcrWords):
+            return boxes
+        if not boxes:
+            return cls()
+        words, x, y, w, h = zip(*boxes)
+        return cls.from_words(list(words), x, y, w, h)
+
+    @classmethod
+    def concat(cls, parts):
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls()
+        if len(parts) == 1:
+            return parts[0]
+        shifts = np.cumsum([0] + [len(p.text) + 1 for p in parts[:-1]])
+        starts = np.concatenate([p.starts + s for p, s in zip(parts, shifts)])
+        ends = np.concatenate([p.ends + s for p, s in zip(parts, shifts)])
+        columns = [np.concatenate([getattr(p, c) for p in parts]) for c in COLUMNS]
+        return cls(" ".join(p.text for p in parts), starts.astype(np.int32), ends.astype(np.int32), *columns)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def words(self):
+        return [self.text[s:e] for s, e in zip(self.starts.tolist(), self.ends.tolist())]
+
+    def boxes(self):
+        """(word, x, y, w, h) tuples, for code that still wants them"""
+        return list(zip(self.words(), self.x.tolist(), self.y.tolist(), self.w.tolist(), self.h.tolist()))
+
+    def offset(self, dx, dy):
+        """Same words moved by (dx, dy); text, offsets and confidences are shared, not copied"""
+        if not dx and not dy:
+            return self
+        return OcrWords(self.text, self.starts, self.ends, self.x + dx, self.y + dy, self.w, self.h, self.conf)
+
+    def centers(self):
+        return self.x + self.w / 2, self.y + self.h / 2
+
+    def in_rect(self, x, y, w, h):
+        """Boolean mask of words whose center lies in the rectangle"""
+        cx, cy = self.centers()
+        return (cx >= x) & (cx < x + w) & (cy >= y) & (cy < y + h)
+
+    def select(self, index):
+        """Subset by boolean mask or index array (the joined string is rebuilt)"""
+        index = np.asarray(index)
+        if index.dtype == bool:
+            if index.all():
+                return self
+            index = np.flatnonzero(index)
+        if not len(index):
+            return OcrWords()
+        starts, ends = self.starts[index].tolist(), self.ends[index].tolist()
+        words = [self.text[s:e] for s, e in zip(starts, ends)]
+        new_starts, new_ends = self._offsets(words)
+        columns = [getattr(self, c)[index] for c in COLUMNS]
+        return OcrWords(" ".join(words), new_starts, new_ends, *columns)
+
+    def overlapping(self, start, end):
+        """Indices of the words that overlap the [start, end) span of the joined text"""
+        first = np.searchsorted(self.ends, start, side="right")
+        last = np.searchsorted(self.starts, end, side="left")
+        return np.arange(first, last)
+
+    def reading_order(self):
+        """Sorted line by line (words whose vertical centers are close), left to right"""
+        n = len(self)
+        if n < 2:
+            return self
+        cy = self.y + self.h / 2
+        by_y = np.argsort(cy, kind="stable")
+        line = np.zeros(n, dtype=np.int32)
+        current, line_y, line_h = 0, cy[by_y[0]], self.h[by_y[0]]
+        for i in by_y[1:].tolist():
+            if abs(cy[i] - line_y) > max(self.h[i], line_h) / 2:
+                current += 1
+                line_y, line_h = cy[i], self.h[i]
+            line[i] = current
+        return self.select(np.lexsort((self.x, line)))
+
+    def nbytes(self):
+        return len(self.text) + sum(getattr(self, c).nbytes for c in ("starts", "ends") + COLUMNS)
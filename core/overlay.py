@@ -7,6 +7,16 @@ class OverlayManager:
         self.root = None
         self.boxes = []
         self.running = False
+        # Area covered by the overlay in screen coordinates; None covers the primary screen
+        self.bounds = None
+        self.origin = (0, 0)
+        # Highlights requested so far, drawn or not (the overlay may not be running)
+        self.highlights = 0
+
+    def set_bounds(self, monitor):
+        """Covers an mss-style {left, top, width, height} area, e.g. all monitors"""
+        self.bounds = (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+        self.origin = self.bounds[:2]
         
     def _run_overlay(self):
         self.root = tk.Tk()
@@ -19,10 +29,14 @@ class OverlayManager:
         self.root.overrideredirect(True)
         self.root.attributes('-topmost', True)
         
-        # Cover the entire screen
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        self.root.geometry(f"{screen_width}x{screen_height}+0+0")
+        # Cover the entire screen (or every monitor when bounds are set)
+        if self.bounds:
+            left, top, screen_width, screen_height = self.bounds
+        else:
+            left, top = 0, 0
+            screen_width = self.root.winfo_screenwidth()
+            screen_height = self.root.winfo_screenheight()
+        self.root.geometry(f"{screen_width}x{screen_height}+{left}+{top}")
         
         # Create a canvas for drawing
         self.canvas = tk.Canvas(self.root, width=screen_width, height=screen_height, bg='white', highlightthickness=0)
@@ -47,8 +61,13 @@ class OverlayManager:
 
     def draw_highlight(self, x, y, w, h, risk="RED", duration=3.0):
         """Draws a box on the screen at the given coordinates"""
+        self.highlights += 1
         if not self.root or not self.canvas:
             return
+
+        # Screen coordinates -> canvas coordinates
+        x -= self.origin[0]
+        y -= self.origin[1]
             
         color = "red" if risk == "RED" else "yellow"
         
@@ -0,0 +1,227 @@
+import re
+import bisect
+import logging
+from collections import deque
+
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r"\s+")
+# Whitespace runs that normalization rewrites: all but a single plain space
+UNNORMALIZED_SPACE = re.compile(r"[^\S ]\s*| \s+")
+
+# Without pyahocorasick, phrase sets up to this size are matched with a prefix-trie regex
+# (faster than a Python automaton loop for small sets, but slow to compile and scan for
+# large ones; see bench_vision.py phrases)
+REGEX_PHRASES = 1000
+
+
+def normalize_phrase(phrase):
+    """Case-folded phrase with whitespace runs collapsed to one space"""
+    return WHITESPACE.sub(" ", phrase.casefold()).strip()
+
+
+def trie_regex(strings):
+    """One group-free regex matching any of the strings, factored on common prefixes (longest match first)"""
+    trie = {}
+    for string in strings:
+        node = trie
+        for ch in string:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        # A string ending here is a shorter match; the greedy ? tries the longer ones first
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class NormalizedText:
+    """Text case-folded and with whitespace runs collapsed to one space, as phrases are.
+
+    original() maps an offset in `text` back to the string it was made from.
+    Screen text is usually single-spaced with no case folding that changes
+    length, and then offsets are the same.
+    """
+
+    __slots__ = ("text", "chars", "starts", "shifts")
+
+    def __init__(self, text):
+        folded = text.casefold()
+        self.chars = None
+        if len(folded) != len(text):
+            # "ß" -> "ss" and the like: remember which character each folded one came from
+            self.chars = [i for i, ch in enumerate(text) for _ in ch.casefold()]
+            self.chars.append(len(text))
+        self.starts = self.shifts = None
+        # str.split() is much faster than a regex at telling that there is nothing to rewrite
+        if " ".join(folded.split()) != folded:
+            self.starts, self.shifts = [], []
+            removed = 0
+            for m in UNNORMALIZED_SPACE.finditer(folded):
+                start, end = m.span()
+                if end - start > 1:
+                    # Characters after this run sit `removed` positions earlier than in `folded`
+                    self.starts.append(start + 1 - removed)
+                    removed += end - start - 1
+                    self.shifts.append(removed)
+            folded = WHITESPACE.sub(" ", folded)
+        self.text = folded
+
+    def original(self, pos):
+        if self.starts:
+            k = bisect.bisect_right(self.starts, pos)
+            if k:
+                pos += self.shifts[k - 1]
+        if self.chars is not None:
+            pos = self.chars[pos]
+        return pos
+
+
+class _Automaton:
+    """Pure-Python Aho-Corasick automaton: goto dicts, failure links and per-node outputs"""
+
+    def __init__(self, keys):
+        goto, out = [{}], [()]
+        for key in keys:
+            node = 0
+            for ch in key:
+                child = goto[node].get(ch)
+                if child is None:
+                    child = goto[node][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                node = child
+            out[node] = (key,)
+        # Breadth-first, so a node's failure target is final before its children need it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                target = 0
+                if node:
+                    f = fail[node]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    target = goto[f].get(ch, 0)
+                fail[child] = target
+                if out[target]:
+                    out[child] = out[child] + out[target]
+        self.goto, self.fail, self.out = goto, fail, out
+
+    def iter(self, text):
+        """Yields (end, key) for every occurrence of every key"""
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            child = goto[node].get(ch)
+            while child is None and node:
+                node = fail[node]
+                child = goto[node].get(ch)
+            node = child or 0
+            if out[node]:
+                for key in out[node]:
+                    yield i + 1, key
+
+
+class PhraseMatcher:
+    """Finds every occurrence of many literal phrases in one pass, in time that does not grow with their number.
+
+    Phrases and text are case-folded and any run of whitespace counts as one
+    space. Aho-Corasick via pyahocorasick when it is installed; otherwise small
+    phrase sets use a prefix-trie regex and large ones a pure-Python automaton.
+    find_all() returns (value, start, end) for every occurrence, overlapping
+    ones included, with offsets into the text passed in.
+    """
+
+    def __init__(self, phrases, backend=None):
+        """`phrases` is an iterable of (phrase, value); the first value given for a phrase is kept.
+
+        `backend` is "pyahocorasick", "regex" or "python"; None picks the fastest available.
+        """
+        self.values = {}  # normalized phrase -> value
+        for phrase, value in phrases:
+            key = normalize_phrase(phrase)
+            if key:
+                self.values.setdefault(key, value)
+        self.keys = list(self.values)
+        if backend is None:
+            if ahocorasick is not None:
+                backend = "pyahocorasick"
+            else:
+                backend = "regex" if len(self.keys) <= REGEX_PHRASES else "python"
+        elif backend == "pyahocorasick" and ahocorasick is None:
+            raise ImportError("pyahocorasick is not installed")
+        self.backend = backend
+        self.automaton = self.regex = self.python = None
+        if not self.keys:
+            pass
+        elif backend == "pyahocorasick":
+            self.automaton = ahocorasick.Automaton()
+            for key in self.keys:
+                self.automaton.add_word(key, key)
+            self.automaton.make_automaton()
+        elif backend == "regex":
+            self.regex = re.compile(trie_regex(self.keys))
+            # A regex hit is the longest phrase at its start; shorter ones there are found by length
+            self.lengths = sorted({len(key) for key in self.keys})
+        elif backend == "python":
+            self.python = _Automaton(self.keys)
+        else:
+            raise ValueError(f"Unknown phrase matcher backend: {backend}")
+        logger.debug(f"{len(self.keys)} phrases, {backend} backend")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _iter(self, text):
+        """(end, phrase) for every occurrence in normalized text"""
+        if self.automaton is not None:
+            # pyahocorasick reports the index of the last character
+            return ((last + 1, key) for last, key in self.automaton.iter(text))
+        if self.python is not None:
+            return self.python.iter(text)
+        return self._iter_regex(text)
+
+    def _iter_regex(self, text):
+        values = self.values
+        search = self.regex.search
+        m = search(text)
+        while m is not None:
+            start, end = m.span()
+            for length in self.lengths:
+                if length > end - start:
+                    break
+                key = text[start:start + length]
+                if key in values:
+                    yield start + length, key
+            m = search(text, start + 1)
+
+    def find_all(self, text):
+        if not self.keys:
+            return []
+        normalized = NormalizedText(text)
+        hits = []
+        for end, key in self._iter(normalized.text):
+            hits.append((self.values[key], normalized.original(end - len(key)), normalized.original(end)))
+        hits.sort(key=lambda hit: (hit[1], hit[2]))
+        return hits
+
+    def matches(self, text):
+        if not self.keys:
+            return False
+        normalized = NormalizedText(text).text
+        if self.regex is not None:
+            return self.regex.search(normalized) is not None
+        return next(iter(self._iter(normalized)), None) is not None
@@ -0,0 +1,167 @@
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item when full, so the newest frame always wins.
+
+    on_drop(item), if given, is called for every discarded item.
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.items = deque()
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        discarded = []
+        with self.cond:
+            while len(self.items) >= self.maxsize:
+                discarded.append(self.items.popleft())
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+        if self.on_drop is not None:
+            for old in discarded:
+                self.on_drop(old)
+
+    def get(self, timeout=None):
+        """Returns the next item, or None on timeout or once the queue is closed"""
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Stage:
+    """One pipeline step running on its own thread.
+
+    A stage without an inbox is a source and calls func() in a loop, after pace()
+    returns True (pace does the waiting, so it is not counted as stage latency).
+    Otherwise func(item) is called for each item; a non-None result is passed
+    to the outbox. on_cpu(name, seconds), if given, receives the thread CPU
+    time of every call.
+    """
+
+    def __init__(self, name, func, inbox=None, outbox=None, pace=None, on_cpu=None):
+        self.name = name
+        self.func = func
+        self.pace = pace
+        self.inbox = inbox
+        self.outbox = outbox
+        self.running = False
+        self.thread = None
+        self.processed = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+        self.on_cpu = on_cpu
+        self.cpu_time = 0.0
+
+    def _run(self):
+        while self.running:
+            if self.inbox is not None:
+                item = self.inbox.get(timeout=0.5)
+                if item is None:
+                    continue
+            elif self.pace is not None and not self.pace():
+                continue
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                result = self.func(item) if self.inbox is not None else self.func()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error in {self.name} stage: {e}")
+                # Do not spin on a source that keeps failing
+                if self.inbox is None:
+                    time.sleep(1)
+                continue
+            finally:
+                cpu = time.thread_time() - cpu_start
+                self.cpu_time += cpu
+                if self.on_cpu is not None:
+                    self.on_cpu(self.name, cpu)
+            latency = time.perf_counter() - start
+            self.processed += 1
+            self.last_latency = latency
+            # Exponential moving average keeps the number readable on a busy stage
+            self.avg_latency = latency if self.processed == 1 else 0.9 * self.avg_latency + 0.1 * latency
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.inbox is not None:
+            self.inbox.close()
+
+    def join(self, timeout=None):
+        if self.thread:
+            self.thread.join(timeout)
+
+    def get_stats(self):
+        stats = {
+            "processed": self.processed,
+            "errors": self.errors,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": self.avg_latency * 1000,
+            "cpu_s": self.cpu_time,
+        }
+        if self.inbox is not None:
+            stats["queue_depth"] = len(self.inbox)
+            stats["dropped"] = self.inbox.dropped
+        return stats
+
+
+class Pipeline:
+    """Chain of stages connected by drop-oldest queues"""
+
+    def __init__(self, queue_size=1, on_cpu=None):
+        self.queue_size = queue_size
+        self.on_cpu = on_cpu
+        self.stages = []
+
+    def add(self, name, func, pace=None, on_drop=None):
+        """Appends a stage; on_drop(item) is called for items its inbox discards"""
+        inbox = None
+        if self.stages:
+            inbox = DropOldestQueue(self.queue_size, on_drop=on_drop)
+            self.stages[-1].outbox = inbox
+        stage = Stage(name, func, inbox=inbox, pace=pace, on_cpu=self.on_cpu)
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            stage.join()
+
+    def get_stats(self):
+        return {stage.name: stage.get_stats() for stage in self.stages}
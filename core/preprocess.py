@@ -0,0 +1,99 @@
+import numpy as np
+from core.capture import GrayConverter
+
+
+def grayscale(pixels):
+    """BGRA/BGR -> 8-bit gray; grayscale input is returned as is"""
+    if pixels.ndim == 2:
+        return pixels
+    if pixels.shape[2] == 3:
+        pixels = np.concatenate([pixels, np.zeros(pixels.shape[:2] + (1,), dtype=np.uint8)], axis=2)
+    return GrayConverter().convert(pixels)
+
+
+def _percentiles(gray, low, high):
+    # Histogram-based percentiles are much cheaper than np.percentile on a sort
+    cdf = np.bincount(gray.ravel(), minlength=256).cumsum()
+    total = cdf[-1]
+    return int(np.searchsorted(cdf, total * low / 100)), int(np.searchsorted(cdf, total * high / 100))
+
+
+def normalize_contrast(gray, low=1, high=99):
+    """Stretches the [low, high] percentile range to the full 0-255 range through a lookup table"""
+    lo, hi = _percentiles(gray, low, high)
+    if hi - lo < 8:
+        return gray
+    lut = np.clip((np.arange(256, dtype=np.float32) - lo) * (255.0 / (hi - lo)), 0, 255).astype(np.uint8)
+    return lut[gray]
+
+
+def invert_dark(gray, threshold=128):
+    """Turns light-on-dark (dark mode) content into dark-on-light, which Tesseract reads better"""
+    if gray.mean() < threshold:
+        return 255 - gray
+    return gray
+
+
+def binarize(gray, window=31, offset=10):
+    """Adaptive threshold: a pixel is white when brighter than its local mean minus offset"""
+    half = window // 2
+    padded = np.pad(gray, half + 1, mode="edge").astype(np.int64)
+    # Integral image gives every window sum with four lookups
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    h, w = gray.shape
+    sums = (integral[window:window + h, window:window + w] - integral[:h, window:window + w]
+            - integral[window:window + h, :w] + integral[:h, :w])
+    mean = sums / (window * window)
+    return np.where(gray > mean - offset, 255, 0).astype(np.uint8)
+
+
+def downscale(gray, factor):
+    """Block-mean downscale by an integer factor"""
+    if factor <= 1:
+        return gray
+    height, width = gray.shape[0] // factor * factor, gray.shape[1] // factor * factor
+    blocks = gray[:height, :width].reshape(height // factor, factor, width // factor, factor)
+    return blocks.mean(axis=(1, 3)).astype(np.uint8)
+
+
+STEPS = {
+    "grayscale": grayscale,
+    "normalize_contrast": normalize_contrast,
+    "invert_dark": invert_dark,
+    "binarize": binarize,
+}
+
+# "downscale" divides by the display scaling (dpi_scale), so HiDPI text reaches
+# Tesseract at roughly the size it was designed for
+PROFILES = {
+    "raw": ("grayscale",),
+    "default": ("grayscale", "invert_dark"),
+    "contrast": ("grayscale", "invert_dark", "normalize_contrast"),
+    "binarize": ("grayscale", "invert_dark", "normalize_contrast", "binarize"),
+    "hidpi": ("grayscale", "downscale", "invert_dark"),
+}
+
+
+class Preprocessor:
+    """Applies a sequence of named steps to an OCR region before it is sent to the engine.
+
+    Picklable, so it travels with OCR jobs to the worker processes.
+    """
+
+    def __init__(self, steps="default", dpi_scale=1.0):
+        self.steps = tuple(PROFILES[steps] if isinstance(steps, str) else steps)
+        unknown = [s for s in self.steps if s != "downscale" and s not in STEPS]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing steps: {unknown}")
+        self.dpi_scale = dpi_scale
+
+    def apply(self, pixels):
+        """Returns (processed pixels, downscale factor applied)"""
+        factor = 1
+        for step in self.steps:
+            if step == "downscale":
+                factor = max(1, int(round(self.dpi_scale)))
+                pixels = downscale(pixels, factor)
+            else:
+                pixels = STEPS[step](pixels)
+        return pixels, factor
@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class AdaptiveScheduler:
+    """Decides when the next frame is captured.
+
+    The interval drops to min_interval while frames keep changing and backs off
+    exponentially towards max_interval while the screen is static. On top of
+    that the interval is stretched whenever the process uses more CPU than
+    cpu_budget (fraction of one core, measured with process time).
+
+    trigger() requests a capture right away (e.g. after user input). While
+    is_idle() reports no user activity, captures drop to idle_interval. Every
+    interval is multiplied by `slowdown` (see CpuGovernor).
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=10.0, backoff=1.5, cpu_budget=0.10,
+                 idle_interval=30.0, is_idle=None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.cpu_budget = cpu_budget
+        self.idle_interval = idle_interval
+        self.is_idle = is_idle
+        self.interval = min_interval
+        self.slowdown = 1.0
+        self.triggered = False
+        self.cpu_usage = 0.0
+        self.last_capture = 0.0
+        self.last_wall = time.monotonic()
+        self.last_cpu = time.process_time()
+        self.stopped = False
+        self.cond = threading.Condition()
+
+    def _measure_cpu(self):
+        now_wall, now_cpu = time.monotonic(), time.process_time()
+        elapsed = now_wall - self.last_wall
+        if elapsed > 0:
+            usage = (now_cpu - self.last_cpu) / elapsed
+            # Smooth over a few frames so one heavy OCR pass does not dominate
+            self.cpu_usage = usage if self.cpu_usage == 0.0 else 0.7 * self.cpu_usage + 0.3 * usage
+        self.last_wall, self.last_cpu = now_wall, now_cpu
+
+    def record(self, changed):
+        """Feeds back whether the last processed frame changed"""
+        with self.cond:
+            self._measure_cpu()
+            if changed:
+                interval = self.min_interval
+            else:
+                interval = self.interval * self.backoff
+            if self.cpu_budget and self.cpu_usage > self.cpu_budget:
+                # Spread the same work over more wall time to get back under budget
+                interval = max(interval, self.interval * self.cpu_usage / self.cpu_budget)
+            self.interval = min(max(interval, self.min_interval), self.max_interval)
+            # Wake a capture that is waiting on a longer, now outdated interval
+            self.cond.notify_all()
+
+    def trigger(self):
+        """Requests a capture as soon as possible"""
+        with self.cond:
+            self.triggered = True
+            self.cond.notify_all()
+
+    def set_slowdown(self, factor):
+        with self.cond:
+            self.slowdown = factor
+            self.cond.notify_all()
+
+    def current_interval(self):
+        if self.is_idle is not None and self.is_idle():
+            return max(self.interval, self.idle_interval) * self.slowdown
+        return self.interval * self.slowdown
+
+    def wait(self):
+        """Blocks until the next capture is due. Returns False once stopped."""
+        with self.cond:
+            while not self.stopped:
+                remaining = self.last_capture + self.current_interval() - time.monotonic()
+                if remaining <= 0 or self.triggered:
+                    self.triggered = False
+                    self.last_capture = time.monotonic()
+                    return True
+                self.cond.wait(remaining)
+            return False
+
+    def start(self):
+        with self.cond:
+            self.stopped = False
+            self.last_capture = 0.0
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+
+    def get_stats(self):
+        return {
+            "interval": self.current_interval(),
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "cpu_usage": self.cpu_usage,
+            "cpu_budget": self.cpu_budget,
+            "slowdown": self.slowdown,
+        }
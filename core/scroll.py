@@ -0,0 +1,68 @@
+import zlib
+from collections import Counter
+import numpy as np
+
+
+def line_hashes(region, axis=0):
+    """Hashes every row (axis=0) or column (axis=1) of a grayscale region.
+
+    Returns (hashes, informative) where informative is False for flat lines,
+    which match anything and would only add noise to the vote.
+    """
+    lines = region if axis == 0 else np.ascontiguousarray(region.T)
+    hashes = np.fromiter((zlib.crc32(line) for line in lines), dtype=np.uint32, count=len(lines))
+    informative = lines.max(axis=1) != lines.min(axis=1)
+    return hashes, informative
+
+
+def estimate_shift(prev, cur, axis=0, max_shift=None, min_votes=8):
+    """Finds the offset by which the lines of `prev` moved to become `cur`.
+
+    Each informative line of `cur` votes for every offset at which the same line
+    hash appears in `prev`. Returns the winning non-zero offset, or 0.
+    """
+    prev_hashes, prev_info = line_hashes(prev, axis)
+    cur_hashes, cur_info = line_hashes(cur, axis)
+    positions = {}
+    for i in np.flatnonzero(prev_info):
+        positions.setdefault(prev_hashes[i], []).append(i)
+
+    votes = Counter()
+    for i in np.flatnonzero(cur_info):
+        matches = positions.get(cur_hashes[i])
+        # Lines that repeat a lot (separators, table borders) are ambiguous
+        if not matches or len(matches) > 4:
+            continue
+        for j in matches:
+            shift = int(i - j)
+            if shift and (max_shift is None or abs(shift) <= max_shift):
+                votes[shift] += 1
+    if not votes:
+        return 0
+    shift, count = votes.most_common(1)[0]
+    needed = max(min_votes, int(cur_info.sum() * 0.2))
+    return shift if count >= needed else 0
+
+
+def detect_shift(prev, cur, rect, max_shift=None):
+    """Returns the (dx, dy) scroll of the (x, y, w, h) area between two frames, or None"""
+    x, y, w, h = rect
+    prev_area = prev[y:y + h, x:x + w]
+    cur_area = cur[y:y + h, x:x + w]
+    dy = estimate_shift(prev_area, cur_area, axis=0, max_shift=max_shift)
+    if dy:
+        return (0, dy)
+    dx = estimate_shift(prev_area, cur_area, axis=1, max_shift=max_shift)
+    if dx:
+        return (dx, 0)
+    return None
+
+
+def moved_from(prev, cur, rect, shift):
+    """True if the (x, y, w, h) area of `cur` is exactly `prev` shifted by (dx, dy)"""
+    x, y, w, h = rect
+    dx, dy = shift
+    sx, sy = x - dx, y - dy
+    if sx < 0 or sy < 0 or sx + w > prev.shape[1] or sy + h > prev.shape[0]:
+        return False
+    return np.array_equal(cur[y:y + h, x:x + w], prev[sy:sy + h, sx:sx + w])
@@ -0,0 +1,45 @@
+import re
+
+# Anything that looks like a link or domain is worth a closer look
+URL_LIKE = re.compile(r"(https?|www\.|\w[\w-]*\.(com|net|org|tk|ml|ga|cf|gq|xyz|top|io|co|info|biz|ru|cn)\b|\w+\.\w+/)", re.IGNORECASE)
+
+# Too common on any screen to justify an escalation on their own
+STOPWORDS = {"the", "and", "for", "you", "your", "here", "now", "this", "that", "with", "from"}
+
+# Characters that low-resolution OCR commonly confuses with letters
+CONFUSABLES = str.maketrans({"0": "o", "1": "l", "|": "l", "5": "s", "$": "s", "@": "a"})
+
+
+def pattern_terms(patterns):
+    """Splits regex threat patterns into the plain lowercase words they contain"""
+    terms = set()
+    for pattern in patterns:
+        plain = re.sub(r"\\(.)", r"\1", pattern)
+        for word in re.split(r"[^a-z0-9.-]+", plain.lower()):
+            word = word.strip(".-")
+            if len(word) >= 3 and word not in STOPWORDS:
+                terms.add(word)
+    return terms
+
+
+class SentinelMatcher:
+    """Decides whether a word from the cheap low-resolution OCR pass deserves a full-resolution look.
+
+    Low-resolution OCR garbles words, so a word counts as a hit when it partially
+    matches a term: one contains the other, or they share a 4-letter prefix.
+    """
+
+    def __init__(self, terms=(), keywords=()):
+        self.terms = {t.lower() for t in terms} | {k.lower() for k in keywords}
+        self.prefixes = {t[:4] for t in self.terms if len(t) >= 4}
+
+    def matches(self, word):
+        word = word.lower().strip(".,:;!?()[]\"'")
+        if len(word) < 3:
+            return False
+        if URL_LIKE.search(word):
+            return True
+        word = word.translate(CONFUSABLES)
+        if word in self.terms or word[:4] in self.prefixes:
+            return True
+        return any((len(word) >= 4 and word in term) or term in word for term in self.terms if len(term) >= 4)
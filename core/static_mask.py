@@ -0,0 +1,125 @@
+import threading
+import numpy as np
+
+
+class StaticMask:
+    """Learns which tiles hold static screen chrome (taskbars, docks, title bars) and keeps them away from OCR.
+
+    A tile that holds words and whose pixels or OCR'd text stayed the same for
+    `stable_frames` frames is masked. The tile is unmasked once a significant
+    part of its coarse thumbnail changes, e.g. a notification or window appears
+    over it. Smaller changes (a clock ticking, a new line of text) are OCR'd
+    once the tile's pixels have settled on new content for `settle_frames`
+    frames, so passing animations and hover effects cost nothing; the tile is
+    unmasked if that OCR finds different text.
+    """
+
+    def __init__(self, tile_width=320, tile_height=160, stable_frames=20, change_threshold=16,
+                 min_changed_cells=0.25, cells=(4, 8), scale=4, settle_frames=1):
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.stable_frames = stable_frames
+        # A thumbnail cell has changed when its mean moved by more than change_threshold gray levels
+        self.change_threshold = change_threshold
+        self.min_changed_cells = min_changed_cells
+        self.cells = cells
+        self.scale = scale
+        self.settle_frames = settle_frames
+        self.stable = None  # (rows, cols) consecutive unchanged frames
+        self.masked = None
+        self.reference = None  # thumbnails of the tiles when they were masked
+        self.signatures = None  # tile signatures when masked or last re-OCR'd
+        self.settled = None  # (rows, cols) frames a masked tile has shown other, unchanging pixels
+        self.unmasked = 0
+        self.rechecked = 0
+        self.lock = threading.Lock()
+
+    def thumbnails(self, gray):
+        """Coarse per-tile thumbnails: (rows, cols, cell rows, cell cols) block means"""
+        s = self.scale
+        ch, cw = self.cells
+        height, width = gray.shape
+        rows = (height + self.tile_height - 1) // self.tile_height
+        cols = (width + self.tile_width - 1) // self.tile_width
+        # Sampled like the text pre-pass, then cropped so cells divide the tile evenly
+        th, tw = max(self.tile_height // s // ch, 1), max(self.tile_width // s // cw, 1)
+        small = gray[::s, ::s]
+        padded = np.pad(small[:rows * th * ch, :cols * tw * cw],
+                        ((0, max(rows * th * ch - small.shape[0], 0)), (0, max(cols * tw * cw - small.shape[1], 0))),
+                        mode="edge")
+        blocks = padded.reshape(rows, ch, th, cols, cw, tw).astype(np.float32)
+        return blocks.mean(axis=(2, 5)).transpose(0, 2, 1, 3)
+
+    def reset(self):
+        with self.lock:
+            self.stable = None
+            self.masked = None
+            self.reference = None
+            self.signatures = None
+            self.settled = None
+
+    def filter(self, dirty, thumbnails, signatures):
+        """Returns (dirty tiles that still need OCR, masked tiles skipped).
+
+        `signatures` are the frame's tile signatures (see TileChangeDetector).
+        Masked tiles with a significant change are unmasked and stay dirty;
+        masked tiles that settled on new pixels are returned dirty for one OCR.
+        """
+        with self.lock:
+            if self.masked is None or self.masked.shape != dirty.shape:
+                self.stable = np.zeros(dirty.shape, dtype=np.int32)
+                self.settled = np.zeros(dirty.shape, dtype=np.int32)
+                self.masked = np.zeros(dirty.shape, dtype=bool)
+                self.reference = thumbnails.copy()
+                self.signatures = signatures.copy()
+                return dirty, np.zeros(dirty.shape, dtype=bool)
+            candidates = dirty & self.masked
+            if candidates.any():
+                changed = np.abs(thumbnails - self.reference) > self.change_threshold
+                significant = candidates & (changed.mean(axis=(2, 3)) >= self.min_changed_cells)
+                self.masked &= ~significant
+                self.stable[significant] = 0
+                self.unmasked += int(significant.sum())
+                candidates &= ~significant
+            # Pixels that differ from the masked content and stopped changing are worth one look
+            settling = self.masked & (signatures != self.signatures) & ~dirty
+            self.settled = np.where(settling, self.settled + 1, 0)
+            recheck = self.settled >= self.settle_frames
+            if recheck.any():
+                self.settled[recheck] = 0
+                self.signatures[recheck] = signatures[recheck]
+                self.rechecked += int(recheck.sum())
+                candidates &= ~recheck
+            # Masked tiles keep their thumbnail from when they were masked, so slow drift still adds up
+            self.reference[~self.masked] = thumbnails[~self.masked]
+            self.signatures[~self.masked] = signatures[~self.masked]
+            return (dirty & ~candidates) | recheck, candidates
+
+    def record(self, unchanged, has_words):
+        """Counts a frame: `unchanged` marks tiles whose pixels or text did not change, `has_words` tiles with text.
+
+        Tiles without words are never masked: blank areas and empty panes are
+        where new text (a chat message, an email) shows up, and unchanged ones
+        cost nothing anyway.
+        """
+        with self.lock:
+            if self.stable is None or self.stable.shape != unchanged.shape:
+                return
+            self.stable = np.where(unchanged, self.stable + 1, 0)
+            # A masked tile re-OCR'd to different text is live content after all
+            self.unmasked += int((self.masked & ~unchanged).sum())
+            self.masked &= unchanged
+            self.masked |= (self.stable >= self.stable_frames) & has_words
+
+    def get_state(self):
+        with self.lock:
+            if self.masked is None:
+                return {"grid": None, "masked": [], "unmasked": self.unmasked, "rechecked": self.rechecked}
+            return {
+                "grid": list(self.masked.shape),
+                "masked": [[int(r), int(c)] for r, c in zip(*np.nonzero(self.masked))],
+                "masked_fraction": float(self.masked.mean()),
+                "stable_frames": self.stable_frames,
+                "unmasked": self.unmasked,
+                "rechecked": self.rechecked,
+            }
@@ -0,0 +1,41 @@
+from difflib import SequenceMatcher
+import numpy as np
+
+
+class TextDiff:
+    """Finds the words that are new on screen since the previous frame.
+
+    Words are compared in reading order. The new ones are returned together with
+    `context` unchanged words on each side, so a phrase that straddles the edge
+    of a change still matches as a whole.
+    """
+
+    def __init__(self, context=4):
+        self.context = context
+        self.previous = []
+
+    def reset(self):
+        self.previous = []
+
+    def update(self, words):
+        """Diffs OcrWords against the previous call; returns (delta OcrWords, new words, removed words)"""
+        current = [w.lower() for w in words.words()]
+        matcher = SequenceMatcher(None, self.previous, current, autojunk=False)
+        new = np.zeros(len(current), dtype=bool)
+        removed = 0
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ("replace", "delete"):
+                removed += i2 - i1
+            if tag in ("replace", "insert"):
+                new[j1:j2] = True
+        self.previous = current
+
+        n_new = int(new.sum())
+        if n_new and self.context:
+            # Widen every new word into a window of +-context words with a running sum of window edges
+            index = np.flatnonzero(new)
+            edges = np.zeros(len(current) + 1, dtype=np.int32)
+            np.add.at(edges, np.maximum(index - self.context, 0), 1)
+            np.add.at(edges, np.minimum(index + self.context + 1, len(current)), -1)
+            new = np.cumsum(edges[:-1]) > 0
+        return words.select(new), n_new, removed
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class TextRegionDetector:
+    """Cheap text-likelihood score per tile from edge density on a downscaled frame.
+
+    Text has many sharp horizontal intensity transitions on a mostly flat
+    background: blank areas have almost no edges, photos and video have soft
+    gradients, and noisy textures have edges but no dominant background level.
+    A tile is scored by its densest `window` (width, height in pixels), slid
+    along each band of rows, so one short line of small text in an otherwise
+    empty tile still counts; the whole-tile mean would dilute it.
+    """
+
+    def __init__(self, scale=4, edge_threshold=40, min_density=0.1, max_density=0.45,
+                 background_tolerance=12, min_background=0.4, window=(32, 8)):
+        self.scale = scale
+        self.edge_threshold = edge_threshold
+        self.min_density = min_density
+        self.max_density = max_density
+        self.background_tolerance = background_tolerance
+        self.min_background = min_background
+        self.window = window
+
+    def _tiles(self, gray, tile_width, tile_height):
+        """Downscales the frame by sampling and returns it as (rows, th, cols, tw) tiles"""
+        s = self.scale
+        height, width = gray.shape
+        # Plain sampling (not averaging) keeps glyph strokes sharp and noise noisy
+        small = gray[::s, ::s].astype(np.int16)
+        # Tiles line up exactly when the tile size is a multiple of the scale
+        th, tw = max(tile_height // s, 1), max(tile_width // s, 1)
+        rows = (height + tile_height - 1) // tile_height
+        cols = (width + tile_width - 1) // tile_width
+        # Pad to whole tiles by repeating the edge, so partial tiles are not scored on padding
+        padded = np.pad(small[:rows * th, :cols * tw],
+                        ((0, max(rows * th - small.shape[0], 0)), (0, max(cols * tw - small.shape[1], 0))),
+                        mode="edge")
+        return padded.reshape(rows, th, cols, tw)
+
+    def tile_scores(self, gray, tile_width, tile_height):
+        """Returns (peak window density, tile edge density, background fraction) arrays of shape (rows, cols)"""
+        tiles = self._tiles(gray, tile_width, tile_height)
+        rows, th, cols, tw = tiles.shape
+        edges = np.zeros(tiles.shape, dtype=bool)
+        edges[:, :, :, 1:] = np.abs(np.diff(tiles, axis=3)) > self.edge_threshold
+        density = edges.mean(axis=(1, 3))
+        background = np.median(tiles, axis=(1, 3))
+        near = np.abs(tiles - background[:, None, :, None]) <= self.background_tolerance
+
+        # Edge counts per band of rows (bands stay inside their tile), then a window
+        # slid along the full width, so text across a tile edge is not split in two
+        ww = max(self.window[0] // self.scale, 1)
+        wh = min(max(self.window[1] // self.scale, 1), th)
+        bands = th // wh
+        counts = edges[:, :bands * wh].reshape(rows, bands, wh, cols * tw).sum(axis=2, dtype=np.int32)
+        cumulative = np.zeros((rows, bands, cols * tw + 1), dtype=np.int32)
+        np.cumsum(counts, axis=2, out=cumulative[:, :, 1:])
+        ww = min(ww, cols * tw)
+        sums = cumulative[:, :, ww:] - cumulative[:, :, :-ww]
+        # Each window counts for the tile holding its center
+        centered = np.zeros((rows, bands, cols * tw), dtype=np.int32)
+        centered[:, :, ww // 2:ww // 2 + sums.shape[2]] = sums
+        peak = centered.reshape(rows, bands, cols, tw).max(axis=(1, 3)) / (ww * wh)
+        return peak, density, near.mean(axis=(1, 3))
+
+    def text_mask(self, gray, tile_width, tile_height):
+        """Boolean (rows, cols) array of tiles likely to contain text"""
+        peak, density, background = self.tile_scores(gray, tile_width, tile_height)
+        return (peak >= self.min_density) & (density <= self.max_density) & (background >= self.min_background)
@@ -0,0 +1,87 @@
+import re
+from core.phrase_matcher import PhraseMatcher
+
+# Most severe first; also the order alternatives are tried at the same position
+SEVERITIES = ("RED", "YELLOW")
+
+# A pattern without unescaped metacharacters (or escapes like \d, \b) matches one fixed string
+LITERAL = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*")
+
+
+def literal_text(pattern):
+    """The string a literal regex pattern matches, or None if it is a real regex"""
+    if not LITERAL.fullmatch(pattern):
+        return None
+    return re.sub(r"\\(.)", r"\1", pattern)
+
+
+class ThreatMatcher:
+    """All threat signatures compiled once and found in one pass over the text.
+
+    Literal signatures (almost all of them, and any number of them) go to a
+    PhraseMatcher, so case and whitespace runs do not matter for them.
+    Signatures that are real regexes go into one alternation without capture
+    groups: groups would turn off the engine's first-character scan and make it
+    several times slower than a loop of single-pattern searches. Its hits are
+    attributed to a signature afterwards from the matched text.
+
+    find_all() returns every hit as a (severity, pattern, start, end) tuple, in
+    text order. A hit does not hide another one starting inside it; at one
+    position only the most severe signature is kept (the longest one among equals).
+    """
+
+    def __init__(self, signatures, flags=0):
+        """`signatures` is an iterable of (severity, regex pattern)"""
+        rank = {severity: i for i, severity in enumerate(SEVERITIES)}
+        self.rank = lambda severity: rank.get(severity, len(rank))
+        self.signatures = sorted(signatures, key=lambda s: self.rank(s[0]))
+        literals = []  # (literal text, (severity, pattern)), most severe first
+        self.regexes = []  # (compiled, severity, pattern), most severe first
+        for severity, pattern in self.signatures:
+            literal = literal_text(pattern) if not flags else None
+            if literal:
+                literals.append((literal, (severity, pattern)))
+            else:
+                self.regexes.append((re.compile(pattern, flags), severity, pattern))
+        self.phrases = PhraseMatcher(literals)
+        self.regex = None
+        if self.regexes:
+            self.regex = re.compile("|".join(f"(?:{pattern})" for _, _, pattern in self.regexes), flags)
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _regex_hits(self, text):
+        hits = []
+        search = self.regex.search
+        m = search(text)
+        while m is not None:
+            start, end = m.span()
+            for compiled, severity, pattern in self.regexes:
+                match = compiled.match(text, start)
+                if match is not None and match.end() == end:
+                    if end > start:
+                        hits.append((severity, pattern, start, end))
+                    break
+            m = search(text, start + 1)
+        return hits
+
+    def find_all(self, text):
+        hits = [value + (start, end) for value, start, end in self.phrases.find_all(text)]
+        if self.regex is not None:
+            hits += self._regex_hits(text)
+        hits.sort(key=lambda h: (h[2], self.rank(h[0]), h[2] - h[3]))
+        # One hit per position: the first after sorting
+        return [hit for i, hit in enumerate(hits) if not i or hit[2] != hits[i - 1][2]]
+
+    def matches(self, text):
+        return self.phrases.matches(text) or (self.regex is not None and self.regex.search(text) is not None)
+
+    @staticmethod
+    def worst(hits):
+        """The first hit of the most severe level found, or None"""
+        for severity in SEVERITIES:
+            for hit in hits:
+                if hit[0] == severity:
+                    return hit
+        return None
@@ -0,0 +1,94 @@
+import zlib
+import numpy as np
+
+
+class TileChangeDetector:
+    """Splits a frame into a grid of tiles and reports which ones changed since the last frame"""
+
+    def __init__(self, tile_width=320, tile_height=160, sample_step=2):
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        # Only every Nth pixel in each direction is hashed (downscaled signature)
+        self.sample_step = sample_step
+        self.shape = None
+        self.signatures = None
+
+    def grid(self, height, width):
+        rows = (height + self.tile_height - 1) // self.tile_height
+        cols = (width + self.tile_width - 1) // self.tile_width
+        return rows, cols
+
+    def tile_rect(self, row, col):
+        """Returns (x, y, w, h) of a tile, clipped to the frame"""
+        height, width = self.shape
+        x = col * self.tile_width
+        y = row * self.tile_height
+        return (x, y, min(self.tile_width, width - x), min(self.tile_height, height - y))
+
+    def compute_signatures(self, frame):
+        height, width = frame.shape[:2]
+        rows, cols = self.grid(height, width)
+        step = self.sample_step
+        sigs = np.zeros((rows, cols), dtype=np.uint32)
+        for r in range(rows):
+            y0 = r * self.tile_height
+            band = frame[y0:y0 + self.tile_height:step]
+            for c in range(cols):
+                x0 = c * self.tile_width
+                tile = np.ascontiguousarray(band[:, x0:x0 + self.tile_width:step])
+                sigs[r, c] = zlib.crc32(tile)
+        return sigs
+
+    def update(self, frame, signatures=None):
+        """Hashes the frame and returns a boolean (rows, cols) array of tiles that changed.
+
+        Signatures already computed with compute_signatures() can be passed in.
+        """
+        sigs = self.compute_signatures(frame) if signatures is None else signatures
+        if self.signatures is None or self.shape != frame.shape[:2]:
+            # First frame (or resolution change): everything is dirty
+            dirty = np.ones(sigs.shape, dtype=bool)
+        else:
+            dirty = sigs != self.signatures
+        self.shape = frame.shape[:2]
+        self.signatures = sigs
+        return dirty
+
+    def dirty_regions(self, dirty):
+        """Merges horizontally adjacent dirty tiles into runs.
+
+        Returns a list of (x, y, w, h, [(row, col), ...]) so each run can be OCR'd in one call.
+        """
+        regions = []
+        rows, cols = dirty.shape
+        for r in range(rows):
+            c = 0
+            while c < cols:
+                if not dirty[r, c]:
+                    c += 1
+                    continue
+                start = c
+                while c < cols and dirty[r, c]:
+                    c += 1
+                x, y, _, h = self.tile_rect(r, start)
+                last_x, _, last_w, _ = self.tile_rect(r, c - 1)
+                regions.append((x, y, last_x + last_w - x, h, [(r, i) for i in range(start, c)]))
+        return regions
+
+    def tile_of(self, x, y):
+        """Returns the (row, col) of the tile containing a point"""
+        height, width = self.shape
+        x = min(max(int(x), 0), width - 1)
+        y = min(max(int(y), 0), height - 1)
+        return (y // self.tile_height, x // self.tile_width)
+
+    def tiles_of(self, xs, ys):
+        """Vectorized tile_of: returns (rows, cols) arrays for arrays of points"""
+        height, width = self.shape
+        xs = np.clip(np.asarray(xs, dtype=np.int64), 0, width - 1)
+        ys = np.clip(np.asarray(ys, dtype=np.int64), 0, height - 1)
+        return ys // self.tile_height, xs // self.tile_width
+
+    def reset(self):
+        self.shape = None
+        self.signatures = None
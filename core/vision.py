@@ -1,78 +1,669 @@
 import threading
 import time
 import logging
-import mss
-from PIL import Image
-import pytesseract
+import numpy as np
 from core.overlay import overlay
+from core.tiling import TileChangeDetector
+from core.scroll import detect_shift, moved_from
+from core.text_regions import TextRegionDetector
+from core.sentinel import SentinelMatcher, pattern_terms
+from core.preprocess import Preprocessor
+from core.word_filter import SHORT_TOKENS, WordFilter
+from core.text_diff import TextDiff
+from core.static_mask import StaticMask
+from core.window import clip_rect, create_window_provider
+from core.capture import GrayConverter
+from core.capture_backend import create_capture_backend
+from core.ocr_cache import OcrCache
+from core.ocr import OcrPool, OcrUnavailable
+from core.ocr_result import OcrWords
+from core.frame_ring import FrameRing
+from core.pipeline import Pipeline
+from core.scheduler import AdaptiveScheduler
+from core.input_trigger import InputActivityMonitor
 
 logger = logging.getLogger(__name__)
 
-# Basic setup, may need exact path on Windows like:
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Tesseract page segmentation mode for the cheap pass: find as much text as possible, in no particular order
+SPARSE_TEXT_PSM = 11
+
+# OCR regions covering less of the frame than this are pickled to the workers; copying the
+# whole frame into shared memory only pays off for larger ones (see bench_vision.py handoff)
+SHARE_FRACTION = 0.2
+
+class MonitorWorker:
+    """Captures and OCRs one monitor with its own pipeline, change detector and scheduler.
+
+    The OCR cache and worker pool are shared with the other monitors through the watcher.
+    """
+
+    def __init__(self, watcher, index, monitor, tile_size=(320, 160), min_interval=1.0, max_interval=10.0,
+                 cpu_budget=0.10, is_idle=None):
+        self.watcher = watcher
+        self.index = index
+        self.monitor = monitor
+        self.last_text = ""
+        self.pipeline = None
+        self.capture = None
+        # Captures speed up while the screen changes and back off while it is static or the user is away
+        self.scheduler = AdaptiveScheduler(min_interval=min_interval, max_interval=max_interval,
+                                           cpu_budget=cpu_budget, is_idle=is_idle)
+        # Only tiles whose pixels changed since the previous frame are re-OCR'd
+        self.detector = TileChangeDetector(tile_width=tile_size[0], tile_height=tile_size[1])
+        self.tile_words = {}  # (row, col) -> OcrWords
+        # Tiles that stayed the same for a while (taskbars, docks, title bars) stop being OCR'd
+        self.static_mask = None
+        if watcher.static_frames:
+            self.static_mask = StaticMask(tile_width=tile_size[0], tile_height=tile_size[1],
+                                          stable_frames=watcher.static_frames)
+        self.gray = GrayConverter()
+        # In window capture mode only the active window is grabbed and pasted into a
+        # full-monitor canvas, so tiles and boxes stay in monitor coordinates
+        self.canvas = None
+        self.last_sweep = None
+        # Previous grayscale frame, kept to recognise scrolled content
+        self.prev_frame = None
+        # Only words that are new since the previous frame (plus some context) are analyzed
+        self.text_diff = TextDiff(context=watcher.diff_context) if watcher.incremental_analysis else None
+        self.stats = {
+            "frames": 0,
+            "tiles_total": 0,
+            "tiles_ocr": 0,
+            "tiles_scrolled": 0,
+            "tiles_skipped": 0,
+            "dirty_fraction": 0.0,
+            "scroll_shift": None,
+            "skipped_fraction": 0.0,
+            "saved_ms": 0.0,
+            "ocr_ms_per_tile": 0.0,
+            "escalations": 0,
+            "words_dropped": 0,
+            "delta_words": 0,
+            "removed_words": 0,
+            "delta_fraction": 0.0,
+            "words_analyzed": 0,
+            "tiles_masked": 0,
+            "masked_fraction": 0.0,
+            "captured_fraction": 1.0,
+            "sweeps": 0,
+        }
+
+    def _ocr_regions(self, frame, regions):
+        """OCRs (x, y, w, h) regions of a grayscale frame and returns their OcrWords in frame coordinates"""
+        cache, margin = self.watcher.cache, self.watcher.tile_margin
+        height, width = frame.shape[:2]
+        results = [None] * len(regions)
+        rects, misses = [], {}  # key -> [(region index, x0, y0), ...]
+        for i, (x, y, w, h) in enumerate(regions):
+            x0, y0 = max(x - margin, 0), max(y - margin, 0)
+            x1, y1 = min(x + w + margin, width), min(y + h + margin, height)
+            key = cache.key(frame[y0:y1, x0:x1])
+            if key in misses:
+                # Identical pixels elsewhere in this frame (e.g. blank areas) are OCR'd once
+                misses[key].append((i, x0, y0))
+                continue
+            results[i] = cache.get(key, x0, y0)
+            if results[i] is None:
+                rects.append((x0, y0, x1, y1))
+                misses[key] = [(i, x0, y0)]
+        if not rects:
+            return results
+
+        # Cache misses are spread over the worker pool shared by all monitors
+        ref = self._share(frame, rects)
+        try:
+            ocr_scale = self.watcher.ocr_scale
+            jobs = [(self._crop(frame, ref, *rect), rect[0], rect[1], ocr_scale, None, self.watcher.preprocessor,
+                     self.watcher.word_filter) for rect in rects]
+            if self.watcher.sentinel:
+                # Cheap pass: downscaled, sparse-text segmentation
+                cheap_scale = max(self.watcher.sentinel_scale, ocr_scale)
+                cheap = [job[:3] + (cheap_scale, SPARSE_TEXT_PSM) + job[5:] for job in jobs]
+                found = self._escalate(frame, ref, jobs, self._run(cheap))
+            else:
+                found = self._run(jobs)
+        finally:
+            if ref is not None:
+                self.watcher.shared_frames.release(ref)
+        for (key, targets), words, (_, jx, jy, *_) in zip(misses.items(), found, jobs):
+            cache.put(key, words, jx, jy)
+            for (i, x0, y0) in targets:
+                results[i] = words.offset(x0 - jx, y0 - jy)
+        return results
+
+    def _share(self, frame, rects):
+        """Copies the frame once into shared memory for the OCR worker processes, or returns None.
+
+        A single job runs inline (see OcrPool.map), where the copy would be pure
+        overhead, and a few small regions are cheaper to pickle than the frame is to copy.
+        """
+        ring = self.watcher.shared_frames
+        if ring is None or self.watcher.pool.executor is None or len(rects) < 2:
+            return None
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+        if area < SHARE_FRACTION * frame.shape[0] * frame.shape[1]:
+            return None
+        return ring.write(frame)
+
+    @staticmethod
+    def _crop(frame, ref, x0, y0, x1, y1):
+        """Job pixels: a reference into the shared frame, or a pickled copy of the region"""
+        if ref is not None:
+            return ref.region(x0, y0, x1, y1)
+        return np.ascontiguousarray(frame[y0:y1, x0:x1])
+
+    def _run(self, jobs):
+        """OCRs jobs on the shared pool and counts the tokens the word filter removed"""
+        results = self.watcher.pool.map(jobs)
+        self.stats["words_dropped"] += sum(words.dropped for words in results)
+        return results
+
+    def _escalate(self, frame, ref, jobs, results):
+        """Re-OCRs at full resolution the lines where the cheap pass saw something suspicious"""
+        sentinel = self.watcher.sentinel
+        height = frame.shape[0]
+        full_jobs, owners = [], []
+        for n, ((pixels, x0, *_), words) in enumerate(zip(jobs, results)):
+            hits = [i for i, word in enumerate(words.words()) if sentinel.matches(word)]
+            if not hits:
+                continue
+            # Region-wide band around each hit, merged when they overlap, so phrases
+            # that continue left or right of the suspicious word are read in full
+            x1 = x0 + pixels.shape[1]
+            bands = []
+            for y, h in sorted(zip(words.y[hits].tolist(), words.h[hits].tolist())):
+                top, bottom = max(y - 2 * h, 0), min(y + 3 * h, height)
+                if bands and top <= bands[-1][1]:
+                    bands[-1][1] = max(bands[-1][1], bottom)
+                else:
+                    bands.append([top, bottom])
+            for top, bottom in bands:
+                full_jobs.append((self._crop(frame, ref, x0, top, x1, bottom), x0, top, 1, None,
+                                  self.watcher.preprocessor, self.watcher.word_filter))
+                owners.append((n, top, bottom))
+        self.stats["escalations"] += len(full_jobs)
+        if not full_jobs:
+            return results
+
+        results = list(results)
+        for (n, top, bottom), full in zip(owners, self._run(full_jobs)):
+            # Full-resolution words replace the cheap ones inside the band
+            cheap = results[n]
+            _, cheap_y = cheap.centers()
+            _, full_y = full.centers()
+            results[n] = OcrWords.concat([cheap.select((cheap_y < top) | (cheap_y >= bottom)),
+                                          full.select((full_y >= top) & (full_y < bottom))])
+        return results
+
+    def _detect_scroll(self, frame, dirty):
+        """Estimates a scroll shift from the columns of dirty tiles, or returns None"""
+        rows = np.flatnonzero(dirty.any(axis=1))
+        _, y0, _, _ = self.detector.tile_rect(rows[0], 0)
+        _, y1, _, h1 = self.detector.tile_rect(rows[-1], 0)
+        shifts = []
+        # One vote per tile column, so a static sidebar next to a scrolling pane
+        # only spoils the columns it actually overlaps
+        for col in np.flatnonzero(dirty.sum(axis=0) >= 2):
+            x, _, w, _ = self.detector.tile_rect(0, col)
+            shift = detect_shift(self.prev_frame, frame, (x, y0, w, y1 + h1 - y0))
+            if shift:
+                shifts.append(shift)
+        if not shifts:
+            return None
+        return max(set(shifts), key=shifts.count)
+
+    def _reuse_scrolled(self, frame, dirty):
+        """Moves words of tiles that were only scrolled and clears them from `dirty`"""
+        self.stats["scroll_shift"] = None
+        if self.prev_frame is None or self.prev_frame.shape != frame.shape or dirty.sum() < 2:
+            return 0
+        shift = self._detect_scroll(frame, dirty)
+        if shift is None:
+            return 0
+        self.stats["scroll_shift"] = shift
+        dx, dy = shift
+        previous = OcrWords.concat(self.tile_words.values())
+        moved = {}
+        for row, col in zip(*np.nonzero(dirty)):
+            row, col = int(row), int(col)
+            rect = self.detector.tile_rect(row, col)
+            if not moved_from(self.prev_frame, frame, rect, shift):
+                continue
+            # Words whose center was in the source area, at their new position
+            x, y, w, h = rect
+            sx, sy = x - dx, y - dy
+            moved[(row, col)] = previous.select(previous.in_rect(sx, sy, w, h)).offset(dx, dy)
+        for tile, words in moved.items():
+            self.tile_words[tile] = words
+            dirty[tile] = False
+        return len(moved)
+
+    def ocr_frame(self, frame, signatures=None, text_mask=None, thumbnails=None):
+        """OCRs only the tiles of a grayscale frame that changed and reuses previous words for the rest.
+
+        Content that only scrolled keeps its previous words at the new offset, so
+        just the newly exposed strip is OCR'd. Tiles outside `text_mask` (the
+        text-likelihood pre-pass) and tiles learned to be static are not OCR'd
+        at all. Returns (text, OcrWords)
+        in reading order, in absolute screen coordinates (monitor offset applied).
+        """
+        first = self.detector.signatures is None or self.detector.shape != frame.shape[:2]
+        dirty = self.detector.update(frame, signatures)
+        if first:
+            self.tile_words = {}
+            self.prev_frame = None
+
+        unchanged = ~dirty
+        try:
+            n_scrolled = self._reuse_scrolled(frame, dirty)
+            n_masked = 0
+            if self.static_mask:
+                if thumbnails is None:
+                    thumbnails = self.static_mask.thumbnails(frame)
+                dirty, masked = self.static_mask.filter(dirty, thumbnails, self.detector.signatures)
+                # Minor changes in a masked tile keep it counted as unchanged
+                unchanged |= masked
+                n_masked = int(masked.sum())
+            n_skipped = 0
+            if text_mask is not None:
+                # A tile that held words is OCR'd whatever the pre-pass says, so its text
+                # cannot vanish (or linger) on a misjudged score
+                keep = text_mask.copy()
+                for (row, col), words in self.tile_words.items():
+                    if len(words):
+                        keep[row, col] = True
+                skipped = dirty & ~keep
+                n_skipped = int(skipped.sum())
+                for row, col in zip(*np.nonzero(skipped)):
+                    self.tile_words.pop((int(row), int(col)), None)
+                dirty &= keep
+            n_ocr = int(dirty.sum())
+            start = time.perf_counter()
+            # Dirty runs are horizontal bands that overlap their neighbours by the margin
+            regions = self.detector.dirty_regions(dirty)
+            results = self._ocr_regions(frame, [r[:4] for r in regions])
+            for (x, y, w, h, tiles), words in zip(regions, results):
+                # Each word belongs to the tile that contains its center, which also
+                # drops the duplicates picked up in the margins of neighbouring runs
+                rows, cols = self.detector.tiles_of(*words.centers())
+                for row, col in tiles:
+                    previous = self.tile_words.get((row, col))
+                    self.tile_words[(row, col)] = words.select((rows == row) & (cols == col))
+                    # Re-OCR'd to the same text (cursor blink, hover effect) still counts as unchanged;
+                    # new text counts as a change even where the pixels settled (static mask rechecks)
+                    unchanged[row, col] = previous is not None and previous.text == self.tile_words[(row, col)].text
+            if n_ocr:
+                per_tile = (time.perf_counter() - start) / n_ocr * 1000
+                prev = self.stats["ocr_ms_per_tile"]
+                self.stats["ocr_ms_per_tile"] = per_tile if not prev else 0.8 * prev + 0.2 * per_tile
+        except Exception:
+            # Tiles that were not OCR'd must be seen as dirty on the next frame
+            self.detector.reset()
+            raise
+        self.prev_frame = frame
+        if self.static_mask:
+            has_words = np.zeros(unchanged.shape, dtype=bool)
+            for (row, col), words in self.tile_words.items():
+                if len(words):
+                    has_words[row, col] = True
+            self.static_mask.record(unchanged, has_words)
+
+        self.stats["frames"] += 1
+        self.stats["tiles_total"] += dirty.size
+        self.stats["tiles_ocr"] += n_ocr
+        self.stats["tiles_scrolled"] += n_scrolled
+        self.stats["tiles_skipped"] += n_skipped
+        self.stats["dirty_fraction"] = n_ocr / dirty.size
+        self.stats["skipped_fraction"] = n_skipped / dirty.size
+        self.stats["tiles_masked"] += n_masked
+        self.stats["masked_fraction"] = n_masked / dirty.size
+        # Estimated from the recent OCR cost of a tile
+        self.stats["saved_ms"] = n_skipped * self.stats["ocr_ms_per_tile"]
+
+        left, top = self.monitor["left"], self.monitor["top"]
+        words = OcrWords.concat(self.tile_words.values()).offset(left, top).reading_order()
+        return words.text, words
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["monitor"] = dict(self.monitor)
+        stats["avg_dirty_fraction"] = stats["tiles_ocr"] / stats["tiles_total"] if stats["tiles_total"] else 0.0
+        stats["scheduler"] = self.scheduler.get_stats()
+        if self.capture:
+            stats["capture"] = self.capture.get_stats()
+        if self.pipeline:
+            stats["pipeline"] = self.pipeline.get_stats()
+        return stats
+
+    # Pipeline stages: capture -> preprocess -> ocr -> analyze. Each runs on its
+    # own thread and hands a frame dict to the next through a drop-oldest queue.
+
+    def _capture_rect(self):
+        """Area to grab: the active window on this monitor, the whole monitor for a sweep, or None"""
+        provider = self.watcher.window_provider
+        now = time.monotonic()
+        if provider is None or self.last_sweep is None or now - self.last_sweep >= self.watcher.sweep_interval:
+            # Periodic low-frequency full-screen sweep, so nothing outside the focused window goes unseen for long
+            self.last_sweep = now
+            self.stats["sweeps"] += 1
+            return self.monitor
+        window = provider.active_window()
+        if window is None:
+            return self.monitor
+        # None when the active window is on another monitor
+        return clip_rect(window, self.monitor)
+
+    def _capture_stage(self):
+        if self.capture is None:
+            # Capture handles (mss, X displays) must be used from the thread that created them
+            self.capture = self.watcher.create_capture()
+        rect = self._capture_rect()
+        if rect is None:
+            return None
+        pixels = self.capture.grab(rect)
+        return {"time": time.time(), "pixels": pixels, "rect": rect}
+
+    def _paste(self, gray, rect):
+        """Places a grayscale capture of `rect` into a copy of the monitor canvas and returns it"""
+        monitor = self.monitor
+        if rect == monitor:
+            self.canvas = gray
+            return gray
+        if self.canvas is None:
+            # The first full frame was dropped on the way; sweep again
+            self.last_sweep = None
+            return None
+        # A new array each frame: the OCR stage keeps the previous one for scroll detection
+        canvas = self.canvas.copy()
+        x, y = rect["left"] - monitor["left"], rect["top"] - monitor["top"]
+        canvas[y:y + gray.shape[0], x:x + gray.shape[1]] = gray
+        self.canvas = canvas
+        return canvas
+
+    def _release_capture(self, frame):
+        """Frees the capture buffer of a frame the preprocess queue dropped"""
+        self.capture.release(frame["pixels"])
+
+    def _preprocess_stage(self, frame):
+        # Convert the captured BGRA buffer to grayscale in one vectorized pass
+        pixels = frame.pop("pixels")
+        try:
+            gray = self.gray.convert(pixels)
+        finally:
+            # The gray copy is all later stages read; the backend may reuse the buffer now
+            self.capture.release(pixels)
+        rect = frame.pop("rect")
+        self.stats["captured_fraction"] = rect["width"] * rect["height"] / (self.monitor["width"] * self.monitor["height"])
+        gray = self._paste(gray, rect)
+        if gray is None:
+            return None
+        frame["gray"] = gray
+        frame["signatures"] = self.detector.compute_signatures(gray)
+        if self.watcher.text_regions:
+            detector = self.detector
+            frame["text_mask"] = self.watcher.text_regions.text_mask(gray, detector.tile_width, detector.tile_height)
+        if self.static_mask:
+            frame["thumbnails"] = self.static_mask.thumbnails(gray)
+        return frame
+
+    def _ocr_stage(self, frame):
+        text = ""
+        words = OcrWords()
+        if not self.watcher.mock_mode:
+            try:
+                text, words = self.ocr_frame(frame["gray"], frame["signatures"], frame.get("text_mask"),
+                                             frame.get("thumbnails"))
+                # Masked tiles that changed count too: the static mask OCRs them once their pixels settle,
+                # which takes another frame soon
+                changed = (self.stats["dirty_fraction"] > 0 or self.stats["skipped_fraction"] > 0
+                           or self.stats["masked_fraction"] > 0 or self.stats["scroll_shift"] is not None)
+                self.scheduler.record(changed=changed)
+            except OcrUnavailable:
+                logger.warning("Tesseract not found. Falling back to mock OCR data.")
+                self.watcher.mock_mode = True
+
+        if self.watcher.mock_mode:
+            # Provide mock data during demo if Tesseract is missing
+            text = "A fake mock text regarding urgent payment needed account suspended netflix-verify.tk"
+            words = OcrWords.from_boxes([(text, 500, 500, 400, 100)]) # Fake box at center
+            self.scheduler.record(changed=False)
+
+        return {"time": frame["time"], "text": text, "words": words}
+
+    def _analyze_stage(self, frame):
+        text, words = frame["text"], frame["words"]
+        if text == self.last_text:
+            return
+        # Kept even when too short to analyze: the watcher revalidates threats against every monitor's text
+        self.last_text = text
+        # Only analyze if text changed significantly
+        if len(text) <= 10:
+            self.watcher.revalidate()
+            return
+        if self.text_diff is None:
+            logger.info(f"Detected screen change via OCR on monitor {self.index}, analyzing...")
+            self.stats["words_analyzed"] += len(words)
+            self.watcher.analyze(text, words)
+            return
+
+        delta, n_new, n_removed = self.text_diff.update(words)
+        self.stats["delta_words"] = n_new
+        self.stats["removed_words"] = n_removed
+        self.stats["delta_fraction"] = len(delta) / len(words) if len(words) else 0.0
+        self.stats["words_analyzed"] += len(delta)
+        logger.info(f"Detected screen change via OCR on monitor {self.index}: {n_new} new words, analyzing...")
+        self.watcher.analyze(delta.text, delta, full_text=text)
+
+    def start(self):
+        self.scheduler.start()
+        governor = self.watcher.governor
+        self.pipeline = Pipeline(queue_size=self.watcher.queue_size, on_cpu=governor.account if governor else None)
+        name = f"vision-{self.index}"
+        self.pipeline.add(f"{name}-capture", self._capture_stage, pace=self.scheduler.wait)
+        self.pipeline.add(f"{name}-preprocess", self._preprocess_stage, on_drop=self._release_capture)
+        self.pipeline.add(f"{name}-ocr", self._ocr_stage)
+        self.pipeline.add(f"{name}-analyze", self._analyze_stage)
+        self.pipeline.start()
+
+    def stop(self):
+        self.scheduler.stop()
+        if self.pipeline:
+            self.pipeline.stop()
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+
 
 class VisionWatcher:
-    def __init__(self, ai_engine):
+    def __init__(self, ai_engine, tile_size=(320, 160), tile_margin=48, cache_bytes=32 * 1024 * 1024,
+                 ocr_workers=None, ocr_backend="auto", min_interval=1.0, max_interval=10.0,
+                 cpu_budget=0.10, queue_size=1, input_triggers=True, idle_after=60.0, monitors=None,
+                 text_prepass=True, sentinel=True, sentinel_scale=2, sentinel_keywords=(),
+                 preprocess="default", dpi_scale=1.0, min_confidence=30, short_tokens=(),
+                 incremental_analysis=True, diff_context=4, static_frames=20, capture_mode="screen",
+                 window_provider=None, sweep_interval=30.0, capture_backend="mss", capture_source=None,
+                 shared_frames=True, governor=None):
         self.ai_engine = ai_engine
         self.running = False
-        self.thread = None
-        self.last_text = ""
         self.mock_mode = False
+        self.queue_size = queue_size
+        self.tile_size = tile_size
+        self.schedule = {"min_interval": min_interval, "max_interval": max_interval, "cpu_budget": cpu_budget}
+        # mss monitor indices to watch (1 is the primary); None watches every monitor
+        self.monitors = monitors
+        self.workers = []
+        # Clicks, scrolls, typing and window switches trigger a capture shortly afterwards
+        self.input_monitor = InputActivityMonitor(self._on_input, idle_after=idle_after) if input_triggers else None
 
-    def _watch_loop(self):
-        with mss.mss() as sct:
-            while self.running:
-                try:
-                    # Capture primary monitor
-                    monitor = sct.monitors[1]
-                    screenshot = sct.grab(monitor)
-                    
-                    # Convert to PIL Image
-                    img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                    
-                    text = ""
-                    boxes = [] # List of tuples: (text, x, y, w, h)
-                    if not self.mock_mode:
-                        try:
-                            # Use image_to_data to get bounding boxes
-                            data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-                            n_boxes = len(data['text'])
-                            for i in range(n_boxes):
-                                word = data['text'][i].strip()
-                                if len(word) > 3: # Ignore tiny artifacts
-                                    # PyTesseract data includes absolute coordinates relative to the captured monitor
-                                    (x, y, w, h) = (data['left'][i], data['top'][i], data['width'][i], data['height'][i])
-                                    boxes.append((word, x, y, w, h))
-                                    text += word + " "
-                        except pytesseract.TesseractNotFoundError:
-                            logger.warning("Tesseract not found. Falling back to mock OCR data.")
-                            self.mock_mode = True
-                    
-                    if self.mock_mode:
-                        # Provide mock data during demo if Tesseract is missing
-                        text = "A fake mock text regarding urgent payment needed account suspended netflix-verify.tk"
-                        boxes = [(text, 500, 500, 400, 100)] # Fake box at center
-
-                    # Only analyze if text changed significantly
-                    if len(text) > 10 and text != self.last_text:
-                        self.last_text = text
-                        logger.info("Detected screen change via OCR, analyzing...")
-                        self.ai_engine.analyze_text_with_boxes(text, boxes)
-                except Exception as e:
-                    logger.error(f"Error in Vision loop: {e}")
-                    
-                time.sleep(5)  # Poll every 5 seconds for proactive monitoring
+        # Extra pixels OCR'd around each dirty run so words on tile edges are not cut
+        self.tile_margin = tile_margin
+        # Regions that were already OCR'd (same pixels) are served from memory
+        self.cache = OcrCache(max_bytes=cache_bytes)
+        # CPU budget shared with the audio engine (see core.governor); it replaces the
+        # schedulers' own process-time budget and picks capture rate, OCR resolution and
+        # OCR parallelism
+        self.governor = governor
+        if governor is not None:
+            self.schedule["cpu_budget"] = 0
+        # Downscale factor of the OCR pass over changed regions (the sentinel's escalations stay at full resolution)
+        self.ocr_scale = 1
+        # Worker processes for OCR (None picks a default from the CPU count, 0 runs inline)
+        self.pool = OcrPool(workers=ocr_workers, backend=ocr_backend,
+                            on_cpu=governor.account if governor else None)
+        # Edge-density pre-pass that keeps images, video and blank areas away from OCR
+        self.text_regions = TextRegionDetector() if text_prepass else None
+        # Frames reach the OCR worker processes through shared memory instead of pickled regions
+        self.shared_frames = FrameRing() if shared_frames else None
+        # Image cleanup applied to every OCR region (a profile name from core.preprocess or a list of steps)
+        self.preprocessor = Preprocessor(preprocess, dpi_scale=dpi_scale)
+        # Low-confidence and short junk tokens are dropped in the OCR workers; short
+        # tokens that threat patterns need (e.g. "OTP") are kept
+        allowlist = set(SHORT_TOKENS) | set(short_tokens)
+        if hasattr(ai_engine, "threat_patterns"):
+            allowlist |= {t for t in pattern_terms(ai_engine.threat_patterns()) if len(t) < 4}
+        self.word_filter = WordFilter(min_conf=min_confidence, allowlist=allowlist)
+        # Two-tier OCR: a cheap low-resolution pass everywhere, full resolution only
+        # around words that look like a threat pattern, a URL or a configured keyword
+        self.sentinel = None
+        self.sentinel_scale = sentinel_scale
+        if sentinel and hasattr(ai_engine, "threat_patterns"):
+            self.sentinel = SentinelMatcher(pattern_terms(ai_engine.threat_patterns()), sentinel_keywords)
+        # Analyze only the words that changed since the previous frame, with diff_context
+        # unchanged words on each side so phrases across the edge of a change still match
+        self.incremental_analysis = incremental_analysis
+        self.diff_context = diff_context
+        # Tiles whose pixels or text did not change for this many frames are masked from OCR (0 disables)
+        self.static_frames = static_frames
+        # "window" grabs only the active window, with a full-screen sweep every sweep_interval seconds
+        self.capture_mode = capture_mode
+        self.window_provider = window_provider if capture_mode == "window" else None
+        self.sweep_interval = sweep_interval
+        # Screen grabbing: "mss", "xshm" (X11 shared memory), "replay" (recorded frames from
+        # capture_source) or "auto"; see core.capture_backend
+        self.capture_backend = capture_backend
+        self.capture_options = {"source": capture_source} if capture_source else {}
+        # AIEngine is not thread-safe and every monitor analyzes from its own thread
+        self.analysis_lock = threading.Lock()
+
+    def create_worker(self, index, monitor):
+        return MonitorWorker(self, index, monitor, tile_size=self.tile_size,
+                             is_idle=self.input_monitor.is_idle if self.input_monitor else None,
+                             **self.schedule)
+
+    def create_capture(self):
+        # Shared-memory buffers: one per frame queued for preprocessing, one being converted and one being grabbed
+        return create_capture_backend(self.capture_backend, buffers=self.queue_size + 2, **self.capture_options)
+
+    def apply_profile(self, profile):
+        """Applies a CpuGovernor cost profile: capture interval, OCR resolution and OCR parallelism"""
+        for worker in self.workers:
+            worker.scheduler.set_slowdown(profile["interval_scale"])
+        self.ocr_scale = profile["ocr_scale"]
+        self.pool.set_active_workers(round(self.pool.workers * profile["worker_fraction"]))
+
+    def screen_text(self):
+        """Latest OCR'd text of every monitor"""
+        return "\n".join(worker.last_text for worker in self.workers)
+
+    def analyze(self, text, words, full_text=None):
+        """Analyzes one monitor's text; with full_text, `text` and `words` are only the part that changed.
+
+        Nothing found on one monitor does not clear the risk: a threat found
+        earlier stays raised for as long as any monitor still shows it.
+        """
+        with self.analysis_lock:
+            if full_text is None or len(words):
+                self.ai_engine.analyze_text_with_boxes(text, words, incremental=True)
+            self.ai_engine.revalidate(self.screen_text())
+
+    def revalidate(self):
+        with self.analysis_lock:
+            self.ai_engine.revalidate(self.screen_text())
+
+    def get_stats(self):
+        stats = {
+            "monitors": {worker.index: worker.get_stats() for worker in self.workers},
+            "cache": self.cache.get_stats(),
+            "shared_frames": self.shared_frames.get_stats() if self.shared_frames else None,
+            "ocr_workers_cpu_s": self.pool.cpu_time,
+            "ocr_scale": self.ocr_scale,
+            "active_ocr_workers": self.pool.active_workers,
+        }
+        frames = sum(w.stats["frames"] for w in self.workers)
+        tiles_total = sum(w.stats["tiles_total"] for w in self.workers)
+        stats["frames"] = frames
+        stats["words_dropped"] = sum(w.stats["words_dropped"] for w in self.workers)
+        stats["words_analyzed"] = sum(w.stats["words_analyzed"] for w in self.workers)
+        stats["avg_dirty_fraction"] = sum(w.stats["tiles_ocr"] for w in self.workers) / tiles_total if tiles_total else 0.0
+        if self.input_monitor:
+            stats["input"] = self.input_monitor.get_stats()
+        return stats
+
+    def get_static_mask(self):
+        """Learned static tiles of every monitor, as (row, col) and absolute screen rectangles"""
+        masks = {}
+        for worker in self.workers:
+            if not worker.static_mask:
+                continue
+            state = worker.static_mask.get_state()
+            detector, monitor = worker.detector, worker.monitor
+            if detector.shape is not None:
+                state["rects"] = [[x + monitor["left"], y + monitor["top"], w, h]
+                                  for x, y, w, h in (detector.tile_rect(r, c) for r, c in state["masked"])]
+            masks[worker.index] = state
+        return masks
+
+    def reset_static_mask(self):
+        """Forgets the learned static tiles; they are OCR'd again on their next change"""
+        for worker in self.workers:
+            if worker.static_mask:
+                worker.static_mask.reset()
+        logger.info("Static screen mask reset.")
+
+    def _on_input(self, reason):
+        logger.debug(f"Input activity ({reason}), capturing.")
+        for worker in self.workers:
+            worker.scheduler.trigger()
 
     def start(self):
         self.running = True
+        if self.capture_mode == "window" and self.window_provider is None:
+            self.window_provider = create_window_provider()
+            if self.window_provider is None:
+                logger.warning("Falling back to full-screen capture.")
+        capture = self.create_capture()
+        try:
+            monitors = capture.monitors
+        finally:
+            capture.close()
+        # monitors[0] is the bounding box of all monitors
+        overlay.set_bounds(monitors[0])
+        indices = self.monitors or range(1, len(monitors))
+        self.workers = [self.create_worker(i, monitors[i]) for i in indices if i < len(monitors)]
+        if self.governor is not None:
+            self.apply_profile(self.governor.profile())
+            self.governor.add_listener(self.apply_profile)
         overlay.start()
-        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
-        self.thread.start()
-        logger.info("VisionWatcher started.")
+        self.pool.start()
+        for worker in self.workers:
+            worker.start()
+        if self.input_monitor:
+            self.input_monitor.start()
+        logger.info(f"VisionWatcher started on {len(self.workers)} monitor(s).")
 
-    def stop(self):
+    def stop(self, wait=False):
+        """wait=True also waits for the OCR worker processes to exit"""
         self.running = False
+        if self.governor is not None:
+            self.governor.remove_listener(self.apply_profile)
+        if self.input_monitor:
+            self.input_monitor.stop()
         overlay.stop()
-        if self.thread:
-            self.thread.join()
+        for worker in self.workers:
+            worker.stop()
+        self.pool.stop(wait=wait)
+        if self.shared_frames:
+            self.shared_frames.close()
+        if self.window_provider:
+            self.window_provider.close()
         logger.info("VisionWatcher stopped.")
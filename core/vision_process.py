@@ -0,0 +1,314 @@
+import threading
+import time
+import signal
+import logging
+import itertools
+import multiprocessing
+from core.ai_engine import AIEngine
+from core.vision import VisionWatcher
+from core.governor import LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Messages are small tuples, first element the kind:
+#   child -> parent: ("ready", monitors), ("heartbeat",), ("alert", risk, confidence, message),
+#                    ("risk", risk, confidence), ("speak", text), ("reply", request_id, payload),
+#                    ("cpu", {stage: seconds})
+#   parent -> child: ("request", request_id, name), ("reset_mask",), ("profile", profile), ("stop",)
+HEARTBEAT_INTERVAL = 2.0
+
+
+class _SpeechRelay:
+    """Stands in for the AudioEngine in the child: speech is spoken by the main process"""
+
+    def __init__(self, send):
+        self.send = send
+
+    def speak(self, text):
+        self.send(("speak", text))
+
+
+class _GovernorRelay:
+    """Stands in for the CpuGovernor in the child: CPU time goes to the main process, profiles come back from it"""
+
+    def __init__(self):
+        self.current = LEVELS[0]
+        self.cpu = {}
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def account(self, stage, seconds):
+        with self.lock:
+            self.cpu[stage] = self.cpu.get(stage, 0.0) + seconds
+
+    def drain(self):
+        with self.lock:
+            cpu, self.cpu = self.cpu, {}
+        return cpu
+
+    def profile(self):
+        return self.current
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def apply(self, profile):
+        self.current = profile
+        for callback in list(self.listeners):
+            callback(profile)
+
+
+class _RelayWatcher(VisionWatcher):
+    """VisionWatcher that reports every alert and risk change of its AIEngine to the main process"""
+
+    def __init__(self, ai_engine, send, **options):
+        super().__init__(ai_engine, **options)
+        self.send = send
+        self.sent_state = ("GREEN", 0.0)
+
+    def analyze(self, text, words, full_text=None):
+        super().analyze(text, words, full_text)
+        self._relay()
+
+    def revalidate(self):
+        super().revalidate()
+        self._relay()
+
+    def _relay(self):
+        with self.analysis_lock:
+            engine = self.ai_engine
+            alerted = bool(engine.recent_alerts)
+            for alert in engine.recent_alerts:
+                self.send(("alert", alert["risk"], engine.threat_confidence, alert["message"]))
+            # The main process keeps the alert history
+            engine.recent_alerts.clear()
+            state = (engine.current_risk, engine.threat_confidence)
+            # An alert sets the main process's risk to its own level, which may be below the engine's
+            if state != self.sent_state or alerted:
+                self.send(("risk",) + state)
+                self.sent_state = state
+
+
+def _child_main(conn, options, log_level, governed=False):
+    """Entry point of the vision process: runs a VisionWatcher until told to stop or the main process goes away"""
+    logging.basicConfig(level=log_level)
+    # Ctrl+C reaches the whole process group; the main process decides when to stop us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    ai_engine = AIEngine()
+    ai_engine.set_audio_engine(_SpeechRelay(send))
+    governor = _GovernorRelay() if governed else None
+    watcher = _RelayWatcher(ai_engine, send, governor=governor, **options)
+    watcher.start()
+    send(("ready", len(watcher.workers)))
+    last_beat = time.monotonic()
+    try:
+        while True:
+            if conn.poll(HEARTBEAT_INTERVAL):
+                message = conn.recv()
+                if message[0] == "stop":
+                    break
+                if message[0] == "reset_mask":
+                    watcher.reset_static_mask()
+                elif message[0] == "profile":
+                    governor.apply(message[1])
+                elif message[0] == "request":
+                    _, request_id, name = message
+                    if name == "stats":
+                        payload = dict(watcher.get_stats(), cpu_s=time.process_time())
+                    else:
+                        payload = watcher.get_static_mask()
+                    send(("reply", request_id, payload))
+            if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL:
+                cpu = governor.drain() if governor else None
+                send(("cpu", cpu) if cpu else ("heartbeat",))
+                last_beat = time.monotonic()
+    except (EOFError, OSError):
+        # The main process is gone
+        pass
+    finally:
+        # The process exits right after; OCR workers must get their shutdown message first
+        watcher.stop(wait=True)
+
+
+class VisionProcess:
+    """Runs the whole vision pipeline (capture, OCR, analysis, overlay) in a supervised child process.
+
+    Keeps screen capture and image conversion off the interpreter (and GIL) that
+    serves the API and audio. Detections come back as small tuples over a pipe
+    and are applied to `ai_engine`; speech requests go to its audio engine. The
+    child is restarted with exponential backoff when it crashes or stops sending
+    heartbeats. Takes the same keyword options as VisionWatcher; with a
+    `governor`, the CPU time of the child's stages counts against its budget
+    and its cost profiles are applied in the child.
+    """
+
+    def __init__(self, ai_engine, restart_delay=1.0, max_restart_delay=60.0, heartbeat_timeout=30.0,
+                 request_timeout=2.0, governor=None, **options):
+        self.ai_engine = ai_engine
+        self.governor = governor
+        self.options = options
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.heartbeat_timeout = heartbeat_timeout
+        self.request_timeout = request_timeout
+        # Forking a process that already runs the event loop, audio and OCR threads is not safe
+        self.context = multiprocessing.get_context("spawn")
+        self.running = False
+        self.process = None
+        self.conn = None
+        self.thread = None
+        self.send_lock = threading.Lock()
+        self.request_ids = itertools.count(1)
+        self.pending = {}  # request id -> [Event, payload]
+        self.stats = {"starts": 0, "restarts": 0, "last_exit_code": None, "messages": 0, "alerts": 0,
+                      "monitors": 0, "started_at": None}
+
+    def _spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_child_main, name="vision",
+                                       args=(child_conn, self.options, logging.getLogger().level,
+                                             self.governor is not None))
+        process.start()
+        # Only the child holds its end, so the pipe reports EOF as soon as the child exits
+        child_conn.close()
+        self.process, self.conn = process, parent_conn
+        self.stats["starts"] += 1
+        self.stats["started_at"] = time.time()
+        logger.info(f"Vision process started (pid {process.pid}).")
+
+    def _handle(self, message):
+        kind = message[0]
+        self.stats["messages"] += 1
+        if kind == "alert":
+            _, risk, confidence, text = message
+            self.ai_engine.add_alert(risk, confidence, text)
+            self.stats["alerts"] += 1
+        elif kind == "risk":
+            _, risk, confidence = message
+            self.ai_engine.current_risk = risk
+            self.ai_engine.threat_confidence = confidence
+        elif kind == "speak":
+            if self.ai_engine.audio_engine:
+                self.ai_engine.audio_engine.speak(message[1])
+        elif kind == "reply":
+            _, request_id, payload = message
+            waiter = self.pending.get(request_id)
+            if waiter is not None:
+                waiter[1] = payload
+                waiter[0].set()
+        elif kind == "cpu":
+            for stage, seconds in message[1].items():
+                self.governor.account(stage, seconds)
+        elif kind == "ready":
+            self.stats["monitors"] = message[1]
+            if self.governor is not None:
+                self._send_profile(self.governor.profile())
+
+    def _reap(self):
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.stats["last_exit_code"] = self.process.exitcode
+
+    def _supervise(self):
+        delay = self.restart_delay
+        while self.running:
+            self._spawn()
+            last_message = time.monotonic()
+            try:
+                while self.running:
+                    if self.conn.poll(1.0):
+                        self._handle(self.conn.recv())
+                        last_message = time.monotonic()
+                    elif time.monotonic() - last_message > self.heartbeat_timeout:
+                        logger.error(f"Vision process sent nothing for {self.heartbeat_timeout:.0f} s, restarting it.")
+                        self.process.kill()
+                        break
+            except (EOFError, OSError):
+                pass
+            if not self.running:
+                return
+            self._reap()
+            # A process that ran for a while before failing starts over with a short delay
+            if time.time() - self.stats["started_at"] > self.max_restart_delay:
+                delay = self.restart_delay
+            logger.error(f"Vision process exited (code {self.stats['last_exit_code']}), restarting in {delay:.1f} s.")
+            self.stats["restarts"] += 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def _send(self, message):
+        try:
+            with self.send_lock:
+                self.conn.send(message)
+            return True
+        except (AttributeError, OSError):
+            # Not started, or the child is restarting
+            return False
+
+    def _send_profile(self, profile):
+        self._send(("profile", profile))
+
+    def _request(self, name):
+        request_id = next(self.request_ids)
+        waiter = self.pending[request_id] = [threading.Event(), None]
+        try:
+            if self._send(("request", request_id, name)):
+                waiter[0].wait(self.request_timeout)
+            return waiter[1]
+        finally:
+            del self.pending[request_id]
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        if self.governor is not None:
+            self.governor.add_listener(self._send_profile)
+        self.thread = threading.Thread(target=self._supervise, name="vision-supervisor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.governor is not None:
+            self.governor.remove_listener(self._send_profile)
+        self._send(("stop",))
+        if self.thread:
+            self.thread.join(timeout=5)
+        if self.process is not None:
+            # The child stops its own workers and OCR pool
+            self.process.join(timeout=10)
+            if self.process.is_alive():
+                logger.warning("Vision process did not stop, terminating it.")
+                self.process.terminate()
+                self.process.join()
+            self.conn.close()
+        logger.info("Vision process stopped.")
+
+    def get_stats(self):
+        """Stats of the VisionWatcher in the child, plus "process" with the supervisor's counters"""
+        process = dict(self.stats, pid=self.process.pid if self.process else None,
+                       alive=bool(self.process and self.process.is_alive()))
+        stats = self._request("stats") or {}
+        stats["process"] = process
+        return stats
+
+    def get_static_mask(self):
+        return self._request("mask") or {}
+
+    def reset_static_mask(self):
+        self._send(("reset_mask",))
@@ -0,0 +1,114 @@
+import sys
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+try:
+    from Xlib import X, display as xdisplay
+except ImportError:
+    xdisplay = None
+
+
+def clip_rect(rect, bounds):
+    """Intersection of two mss-style {left, top, width, height} rectangles, or None"""
+    left = max(rect["left"], bounds["left"])
+    top = max(rect["top"], bounds["top"])
+    right = min(rect["left"] + rect["width"], bounds["left"] + bounds["width"])
+    bottom = min(rect["top"] + rect["height"], bounds["top"] + bounds["height"])
+    if right <= left or bottom <= top:
+        return None
+    return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+
+class X11WindowProvider:
+    """Active window geometry from the EWMH _NET_ACTIVE_WINDOW hint of the window manager.
+
+    Every monitor's capture thread asks; a python-xlib Display is not
+    thread-safe, so requests go through one lock.
+    """
+
+    def __init__(self, display_name=None):
+        self.lock = threading.Lock()
+        self.display = xdisplay.Display(display_name)
+        self.root = self.display.screen().root
+        self.active_atom = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+        self.extents_atom = self.display.intern_atom("_NET_FRAME_EXTENTS")
+
+    def active_window(self):
+        with self.lock:
+            return self._active_window()
+
+    def _active_window(self):
+        try:
+            prop = self.root.get_full_property(self.active_atom, X.AnyPropertyType)
+            if not prop or not prop.value or not prop.value[0]:
+                return None
+            window = self.display.create_resource_object("window", prop.value[0])
+            geometry = window.get_geometry()
+            # Geometry is relative to the parent (usually a window manager frame)
+            origin = self.root.translate_coords(window, 0, 0)
+            left, top, width, height = origin.x, origin.y, geometry.width, geometry.height
+            # Include the decorations, title bars carry text too
+            extents = window.get_full_property(self.extents_atom, X.AnyPropertyType)
+            if extents and len(extents.value) == 4:
+                l, r, t, b = extents.value
+                left, top, width, height = left - l, top - t, width + l + r, height + t + b
+            return {"left": left, "top": top, "width": width, "height": height}
+        except Exception as e:
+            # The window can disappear between the two requests
+            logger.debug(f"Could not read the active window: {e}")
+            return None
+
+    def close(self):
+        with self.lock:
+            self.display.close()
+
+
+class Win32WindowProvider:
+    """Foreground window rectangle through user32"""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self.ctypes = ctypes
+        self.wintypes = wintypes
+        self.user32 = ctypes.windll.user32
+
+    def active_window(self):
+        # A RECT per call: every monitor's capture thread asks at the same time
+        r = self.wintypes.RECT()
+        hwnd = self.user32.GetForegroundWindow()
+        if not hwnd or not self.user32.GetWindowRect(hwnd, self.ctypes.byref(r)):
+            return None
+        return {"left": r.left, "top": r.top, "width": r.right - r.left, "height": r.bottom - r.top}
+
+    def close(self):
+        pass
+
+
+class FakeWindowProvider:
+    """Reports a fixed window rectangle (or None), for tests and benchmarks"""
+
+    def __init__(self, window=None):
+        self.window = window
+
+    def active_window(self):
+        return dict(self.window) if self.window else None
+
+    def close(self):
+        pass
+
+
+def create_window_provider():
+    """Active-window provider for this platform, or None when there is none"""
+    try:
+        if sys.platform == "win32":
+            return Win32WindowProvider()
+        if xdisplay is not None:
+            return X11WindowProvider()
+    except Exception as e:
+        logger.warning(f"Active window detection unavailable: {e}")
+        return None
+    logger.warning("Active window detection unavailable (python-xlib is not installed).")
+    return None
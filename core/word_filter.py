@@ -0,0 +1,29 @@
+import numpy as np
+
+# Short tokens that matter for threat detection and must survive the length filter
+SHORT_TOKENS = {"otp", "pin", "cvv", "ssn", "2fa", "tan"}
+
+PUNCTUATION = ".,:;!?()[]\"'"
+
+
+class WordFilter:
+    """Decides which OCR tokens are kept, over a whole Tesseract result at once.
+
+    Tokens below `min_conf` (Tesseract's 0-100 word confidence) are dropped, and
+    so are tokens shorter than `min_length` unless they are on the allowlist.
+    Picklable, so it travels with OCR jobs to the worker processes.
+    """
+
+    def __init__(self, min_conf=30, min_length=4, allowlist=SHORT_TOKENS):
+        self.min_conf = min_conf
+        self.min_length = min_length
+        self.allowlist = {t.lower() for t in allowlist}
+
+    def keep(self, texts, conf):
+        """Boolean mask over the tokens; `texts` are already stripped"""
+        lengths = np.fromiter(map(len, texts), dtype=np.int32, count=len(texts))
+        keep = (lengths > 0) & (np.asarray(conf, dtype=np.float32) >= self.min_conf)
+        # Only the few confident short tokens need a string lookup
+        for i in np.flatnonzero(keep & (lengths < self.min_length)).tolist():
+            keep[i] = texts[i].lower().strip(PUNCTUATION) in self.allowlist
+        return keep
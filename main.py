@@ -4,6 +4,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 import json
 import logging
+import multiprocessing
 import os
 import sys
 import subprocess
@@ -11,6 +12,9 @@ import webbrowser
 import uvicorn
 
 from core.vision import VisionWatcher
+from core.vision_process import VisionProcess
+from core.loop_lag import LoopLagMonitor
+from core.governor import CpuGovernor
 from core.audio import AudioEngine
 from core.ai_engine import AIEngine
 from core.app_launcher import AppLauncher
@@ -31,11 +35,29 @@ ui_dir = os.path.join(base_dir, "ui")
 # Mount the UI directory
 app.mount("/ui", StaticFiles(directory=ui_dir), name="ui")
 
-# Global instances
-ai_engine = AIEngine()
-audio_engine = AudioEngine(ai_engine)
-vision_watcher = VisionWatcher(ai_engine)
-app_launcher = AppLauncher()
+# Global instances, created at startup rather than on import: spawned OCR worker
+# processes (and the frozen build's workers) import this module again
+ai_engine = None
+governor = None
+audio_engine = None
+vision_watcher = None
+loop_lag = None
+app_launcher = None
+
+
+def create_components():
+    global ai_engine, governor, audio_engine, vision_watcher, loop_lag, app_launcher
+    ai_engine = AIEngine()
+    # Background monitoring (vision and audio) stays under 5% of one core on average
+    governor = CpuGovernor(budget=0.05)
+    audio_engine = AudioEngine(ai_engine, governor=governor)
+    # AEGIS_VISION_PROCESS=1 runs screen monitoring in a supervised child process, off this interpreter's GIL
+    if os.environ.get("AEGIS_VISION_PROCESS") == "1":
+        vision_watcher = VisionProcess(ai_engine, governor=governor)
+    else:
+        vision_watcher = VisionWatcher(ai_engine, governor=governor)
+    loop_lag = LoopLagMonitor()
+    app_launcher = AppLauncher()
 
 # Websocket connection manager
 class ConnectionManager:
@@ -71,8 +93,11 @@ async def state_broadcaster():
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Aegis AI components...")
+    create_components()
     # Start background watchers
     asyncio.create_task(state_broadcaster())
+    asyncio.create_task(loop_lag.run())
+    governor.start()
     vision_watcher.start()
     audio_engine.start()
     
@@ -88,6 +113,7 @@ async def shutdown_event():
     logger.info("Shutting down Aegis AI components...")
     vision_watcher.stop()
     audio_engine.stop()
+    governor.stop()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -104,6 +130,29 @@ async def dismiss_alerts():
     ai_engine.clear_alerts()
     return {"status": "success"}
 
+# Plain (not async) handlers run in FastAPI's threadpool: with a vision process these
+# wait for its reply (up to VisionProcess.request_timeout) and must not block the event loop
+@app.get("/api/vision/stats")
+def get_vision_stats():
+    return vision_watcher.get_stats()
+
+@app.get("/api/vision/mask")
+def get_vision_mask():
+    return {"monitors": vision_watcher.get_static_mask()}
+
+@app.post("/api/vision/mask/reset")
+def reset_vision_mask():
+    vision_watcher.reset_static_mask()
+    return {"status": "success"}
+
+@app.get("/api/budget")
+async def get_budget():
+    return governor.get_stats()
+
+@app.get("/api/loop/lag")
+async def get_loop_lag():
+    return dict(loop_lag.get_stats(), vision_process=isinstance(vision_watcher, VisionProcess))
+
 @app.get("/api/apps")
 async def get_apps():
     return {"apps": app_launcher.get_available_apps()}
@@ -115,6 +164,9 @@ async def get():
         return HTMLResponse(f.read())
 
 if __name__ == "__main__":
+    # Needed for the OCR worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+
     # Fix for PyInstaller --windowed mode where sys.stdout/stderr are None
     if sys.stdout is None:
         class DummyStdout:
@@ -0,0 +1,158 @@
+import argparse
+import json
+import logging
+import time
+import numpy as np
+
+from core.ai_engine import AIEngine
+from core.capture import GrayConverter
+from core.capture_backend import ReplayBackend, write_archive
+from core.overlay import overlay
+from core.vision import VisionWatcher
+
+STAGES = ("capture", "preprocess", "ocr", "analyze")
+
+
+def percentiles(seconds):
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds) * 1000
+    return {"p50": float(np.percentile(ms, 50)), "p90": float(np.percentile(ms, 90)),
+            "p99": float(np.percentile(ms, 99)), "max": float(ms.max())}
+
+
+def replay(source, realtime=False, speed=1.0, interval=1.0, show_overlay=False, **watcher_options):
+    """Runs recorded frames through capture, OCR, AIEngine analysis and the overlay, one frame at a time.
+
+    As fast as possible by default. With realtime=True frames are paced by their
+    timestamps (or `interval` seconds apart), divided by `speed`, and frames the
+    pipeline is too late for are skipped, as they would be on a live screen.
+    """
+    ai_engine = AIEngine()
+    watcher = VisionWatcher(ai_engine, capture_backend="replay", capture_source=source, input_triggers=False,
+                            **watcher_options)
+    capture = ReplayBackend(source, loop=False)
+    worker = watcher.create_worker(1, capture.monitors[1])
+    worker.capture = capture
+    watcher.workers = [worker]
+    stages = (worker._capture_stage, worker._preprocess_stage, worker._ocr_stage, worker._analyze_stage)
+    if show_overlay:
+        overlay.set_bounds(capture.monitors[0])
+        overlay.start()
+    watcher.pool.start()
+
+    timings = {name: [] for name in STAGES}
+    detections = []
+    processed = skipped = 0
+    first = capture.timestamp(0)
+
+    def due(i):
+        """Seconds after the start at which frame i is shown"""
+        return ((capture.timestamp(i) - first) if first is not None else i * interval) / speed
+
+    start = time.perf_counter()
+    try:
+        for index in range(capture.count):
+            if realtime:
+                # Skip frames whose successor is already due
+                if index + 1 < capture.count and time.perf_counter() - start > due(index + 1):
+                    skipped += 1
+                    continue
+                delay = due(index) - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            capture.index = index
+            alerts = len(ai_engine.recent_alerts)
+            frame = None
+            for name, stage in zip(STAGES, stages):
+                stage_start = time.perf_counter()
+                frame = stage(frame) if frame is not None else stage()
+                timings[name].append(time.perf_counter() - stage_start)
+                if frame is None:
+                    break
+            processed += 1
+            for alert in ai_engine.recent_alerts[alerts:]:
+                detections.append({"frame": index, **alert})
+    finally:
+        elapsed = time.perf_counter() - start
+        watcher.pool.stop(wait=True)
+        if watcher.shared_frames:
+            watcher.shared_frames.close()
+        capture.close()
+        if show_overlay:
+            overlay.stop()
+
+    return {
+        "source": source,
+        "frames": processed,
+        "skipped": skipped,
+        "elapsed_s": elapsed,
+        "fps": processed / elapsed if elapsed else 0.0,
+        "mock_ocr": watcher.mock_mode,
+        "detections": detections,
+        "highlights": overlay.highlights,
+        "stages_ms": {name: percentiles(values) for name, values in timings.items()},
+        "tiles_ocr": worker.stats["tiles_ocr"],
+        "words_analyzed": worker.stats["words_analyzed"],
+        "cache": watcher.cache.get_stats(),
+    }
+
+
+def print_report(report):
+    print(f"{report['frames']} frames from {report['source']} in {report['elapsed_s']:.2f} s "
+          f"({report['fps']:.2f} frames/sec, {report['skipped']} skipped)")
+    if report["mock_ocr"]:
+        print("Tesseract not found: mock OCR text was used")
+    print(f"{len(report['detections'])} detections, {report['highlights']} highlights, "
+          f"{report['tiles_ocr']} tiles OCR'd, {report['words_analyzed']} words analyzed")
+    for detection in report["detections"]:
+        print(f"  frame {detection['frame']:5d}  {detection['risk']:6s}  {detection['message']}")
+    print(f"{'stage':12s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}  (ms)")
+    for name, p in report["stages_ms"].items():
+        if p:
+            print(f"{name:12s} {p['p50']:9.2f} {p['p90']:9.2f} {p['p99']:9.2f} {p['max']:9.2f}")
+
+
+def pack(source, archive, gray=False):
+    """Packs a directory of screenshots (and its timestamps.txt) into a compressed frame archive"""
+    capture = ReplayBackend(source, loop=False)
+    monitor = capture.monitors[1]
+    frames = (capture.grab(monitor) for _ in range(capture.count))
+    if gray:
+        converter = GrayConverter()
+        frames = (converter.convert(frame) for frame in frames)
+    count = write_archive(archive, frames, capture.timestamps)
+    capture.close()
+    print(f"Packed {count} frames into {archive}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded screens through the vision pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Replay a recording and report throughput, detections and stage latency")
+    p.add_argument("source", help="Directory of screenshots (optionally with timestamps.txt) or a .npz frame archive")
+    p.add_argument("--realtime", action="store_true", help="Pace frames by their timestamps instead of running flat out")
+    p.add_argument("--speed", type=float, default=1.0, help="Real-time speed-up factor")
+    p.add_argument("--interval", type=float, default=1.0, help="Seconds between frames without timestamps")
+    p.add_argument("--overlay", action="store_true", help="Show highlights on an overlay window")
+    p.add_argument("--ocr-workers", type=int, default=None)
+    p.add_argument("--preprocess", default="default")
+    p.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    p = sub.add_parser("pack", help="Pack a directory of screenshots into a compressed frame archive")
+    p.add_argument("source")
+    p.add_argument("archive")
+    p.add_argument("--gray", action="store_true", help="Store grayscale frames (4x smaller)")
+
+    args = parser.parse_args()
+    if args.command == "pack":
+        pack(args.source, args.archive, args.gray)
+        raise SystemExit
+    logging.basicConfig(level=logging.WARNING)
+    report = replay(args.source, realtime=args.realtime, speed=args.speed, interval=args.interval,
+                    show_overlay=args.overlay, ocr_workers=args.ocr_workers, preprocess=args.preprocess)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)